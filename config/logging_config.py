@@ -1,9 +1,15 @@
 import logging
 
 def configure_logging(log_level: str = "INFO") -> logging.Logger:
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper(), logging.INFO),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+    level = getattr(logging, log_level.upper(), logging.INFO)
+    root = logging.getLogger()
+    # Налаштовуємо handlers лише один раз; повторні виклики лише змінюють рівень
+    if not root.handlers:
+        logging.basicConfig(
+            level=level,
+            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
+    else:
+        root.setLevel(level)
     logger = logging.getLogger(__name__)
     return logger
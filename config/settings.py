@@ -1,5 +1,64 @@
+import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 APP_NAME = "RAG-system"
+
+
+@dataclass(frozen=True)
+class RAGConfig:
+    """
+    Налаштування RAG системи зі змінних середовища.
+    Поля з None мають різні значення за замовчуванням у main.py та server.py.
+    """
+
+    # Embeddings
+    embedder_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedder_batch_size: int = 32
+    embedder_precision: Optional[str] = None
+    embedder_compile: bool = False
+
+    # Chunking
+    chunk_size: int = 800
+    chunk_overlap: int = 150
+
+    # Retrieval
+    top_k: int = 4
+    min_similarity: float = 0.3
+    query_cache_path: str = "data/query_cache.db"
+
+    # LLM
+    llm_provider: Optional[str] = None
+    llm_model: Optional[str] = None
+    llm_temperature: float = 0.1
+    llm_max_tokens: int = 800
+    perplexity_api_key: Optional[str] = None
+
+
+def load_config() -> RAGConfig:
+    """
+    Зчитує змінні середовища один раз (викликати після load_dotenv()).
+    """
+    defaults = RAGConfig()
+    return RAGConfig(
+        embedder_model=os.getenv("EMBEDDER_MODEL", defaults.embedder_model),
+        embedder_batch_size=int(
+            os.getenv("EMBEDDER_BATCH_SIZE", defaults.embedder_batch_size)
+        ),
+        embedder_precision=os.getenv("EMBEDDER_PRECISION"),
+        embedder_compile=os.getenv("EMBEDDER_COMPILE", "false").lower()
+        in ("1", "true", "yes"),
+        chunk_size=int(os.getenv("CHUNK_SIZE", defaults.chunk_size)),
+        chunk_overlap=int(os.getenv("CHUNK_OVERLAP", defaults.chunk_overlap)),
+        top_k=int(os.getenv("TOP_K", defaults.top_k)),
+        min_similarity=float(os.getenv("MIN_SIMILARITY", defaults.min_similarity)),
+        query_cache_path=os.getenv("QUERY_CACHE_PATH", defaults.query_cache_path),
+        llm_provider=os.getenv("LLM_PROVIDER"),
+        llm_model=os.getenv("LLM_MODEL"),
+        llm_temperature=float(os.getenv("LLM_TEMPERATURE", defaults.llm_temperature)),
+        llm_max_tokens=int(os.getenv("LLM_MAX_TOKENS", defaults.llm_max_tokens)),
+        perplexity_api_key=os.getenv("PERPLEXITY_API_KEY"),
+    )
@@ -1,10 +1,21 @@
 import os
+import json
+import hashlib
 import argparse
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import lru_cache
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.markdown import Markdown
 from pathlib import Path
+import numpy as np
 
+from config.settings import load_config
 from src.preprocessing.preprocessor_factory import PreprocessorFactory
 from src.embeddings.embedder import EmbedderFactory
 from src.storage.storage import FAISSStorage
@@ -13,12 +24,229 @@ from src.agent.llm_client import LLMClientFactory
 
 # Завантажуємо змінні середовища
 load_dotenv()
+CONFIG = load_config()
 
 console = Console()
 
 
-def index_documents(preprocessor, embedder, storage, data_dir="data/raw"):
-    """Індексує всі документи з директорії"""
+@lru_cache(maxsize=1)
+def get_preprocessor(worker="minimal", default_parser="auto"):
+    """Повертає спільний (в межах процесу) Preprocessor"""
+    return PreprocessorFactory.create(worker=worker, default_parser=default_parser)
+
+
+@lru_cache(maxsize=1)
+def get_embedder(model_name, batch_size, precision="fp32"):
+    """Повертає спільний embedder (модель завантажується один раз)"""
+    return EmbedderFactory.create(
+        method="sbert",
+        model_name=model_name,
+        batch_size=batch_size,
+        precision=precision,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_storage(dimension=384, index_type="flat", embedder_info=None):
+    """Повертає спільне векторне сховище"""
+    return FAISSStorage(
+        dimension=dimension, index_type=index_type, embedder_info=embedder_info
+    )
+
+
+# Кількість чанків, що векторизуються та додаються в storage за один раз
+EMBED_BATCH_SIZE = 512
+
+# Максимум оброблених, але ще не спожитих документів (thread-режим)
+MAX_CONCURRENT_RESULTS = 32
+
+# Шлях до індексу (без розширення)
+INDEX_PATH = "data/indexes/knowledge_base"
+
+# Зберігати checkpoint кожні N оброблених файлів
+CHECKPOINT_EVERY = 100
+
+
+def _process_file_worker(file_path, chunk_size, chunk_overlap):
+    """
+    Обробляє один документ в окремому процесі.
+    Preprocessor створюється один раз на процес (без спільного стану між процесами).
+    """
+    preprocessor = get_preprocessor()
+    result = preprocessor.process_document(
+        str(file_path),
+        enable_chunking=True,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    return file_path, result.chunks
+
+
+def _embed_length_sorted(embedder, chunks):
+    """
+    Векторизує чанки, попередньо відсортовані за довжиною тексту,
+    щоб mini-batch'і embedder'а містили тексти схожої довжини (менше padding).
+    Повертає матрицю (N, dim) в початковому порядку чанків.
+    """
+    order = np.argsort([len(chunk.text) for chunk in chunks], kind="stable")
+    sorted_vectors = embedder.embed_matrix([chunks[i] for i in order])
+
+    vectors = np.empty_like(sorted_vectors)
+    vectors[order] = sorted_vectors
+    return vectors
+
+
+def _iter_file_chunks_threaded(preprocessor, files, chunk_size, chunk_overlap, workers):
+    """
+    Обробляє файли в пулі потоків (парсинг PDF частково відпускає GIL).
+    Кількість документів "в польоті" обмежена MAX_CONCURRENT_RESULTS,
+    результати віддаються в порядку завершення.
+    """
+
+    def process(file_path):
+        result = preprocessor.process_document(
+            str(file_path),
+            enable_chunking=True,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+        return file_path, result.chunks
+
+    max_pending = max(workers, MAX_CONCURRENT_RESULTS)
+    pending = set()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for file_path in files:
+            # Backpressure: чекаємо, поки споживач забере частину результатів
+            while len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+            pending.add(executor.submit(process, file_path))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _iter_file_chunks(
+    preprocessor, files, chunk_size, chunk_overlap, workers=1, executor="process"
+):
+    """
+    Генератор (file_path, chunks) по файлах.
+    При workers > 1 парсинг і чанкінг виконуються в пулі процесів або потоків,
+    тож обробка наступних файлів перекривається з векторизацією.
+    Послідовно (workers=1) chunks - потік (process_document_stream): документ
+    не тримається в пам'яті цілком; його треба спожити до наступного файлу.
+    """
+    if workers > 1 and executor == "thread":
+        yield from _iter_file_chunks_threaded(
+            preprocessor, files, chunk_size, chunk_overlap, workers
+        )
+        return
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(
+                _process_file_worker,
+                files,
+                [chunk_size] * len(files),
+                [chunk_overlap] * len(files),
+                chunksize=1,
+            )
+        return
+
+    for file_path in files:
+        yield file_path, preprocessor.process_document_stream(
+            str(file_path),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+
+
+def _text_digest(text):
+    """Ключ дедуплікації чанків за текстом"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _embed_and_store(embedder, storage, chunks, seen):
+    """
+    Векторизує batch чанків та додає його в storage.
+    Чанки з текстом, що вже зустрічався (seen: hash -> chunk_id), не векторизуються,
+    а реєструються як аліаси вже доданого вектора.
+    """
+    unique, duplicates = [], []
+    for chunk in chunks:
+        digest = _text_digest(chunk.text)
+        original_chunk_id = seen.get(digest)
+        if original_chunk_id is None:
+            seen[digest] = chunk.chunk_id
+            unique.append(chunk)
+        else:
+            duplicates.append((chunk, original_chunk_id))
+
+    if unique:
+        console.print(f"🔢 Векторизація {len(unique)} чанків...")
+        vectors = _embed_length_sorted(embedder, unique)
+        storage.add_vectors(vectors, unique)
+
+    for chunk, original_chunk_id in duplicates:
+        storage.add_alias(chunk, original_chunk_id)
+
+    if duplicates:
+        console.print(f"♊ Пропущено дублікатів: {len(duplicates)}")
+
+
+def _save_checkpoint(storage, index_path, processed_files):
+    """
+    Зберігає проміжний індекс + список оброблених файлів.
+    Файли пишуться у тимчасові й замінюються через os.replace; список файлів
+    (.json) з'являється останнім, тож наявний checkpoint завжди узгоджений.
+    """
+    checkpoint = f"{index_path}.ckpt"
+    tmp = f"{checkpoint}.tmp"
+
+    storage.save(tmp)
+    Path(f"{tmp}.json").write_text(
+        json.dumps(sorted(processed_files), ensure_ascii=False), encoding="utf-8"
+    )
+
+    Path(f"{checkpoint}.json").unlink(missing_ok=True)
+    for ext in (".faiss", ".pkl", ".json"):
+        os.replace(f"{tmp}{ext}", f"{checkpoint}{ext}")
+
+
+def _load_checkpoint(storage, index_path):
+    """Відновлює storage з checkpoint; повертає множину вже оброблених файлів"""
+    checkpoint = f"{index_path}.ckpt"
+    if not Path(f"{checkpoint}.json").exists():
+        return set()
+
+    storage.load(checkpoint)
+    return set(json.loads(Path(f"{checkpoint}.json").read_text(encoding="utf-8")))
+
+
+def _remove_checkpoint(index_path):
+    for ext in (".faiss", ".pkl", ".json"):
+        Path(f"{index_path}.ckpt{ext}").unlink(missing_ok=True)
+
+
+def index_documents(
+    preprocessor,
+    embedder,
+    storage,
+    data_dir="data/raw",
+    workers=1,
+    executor="process",
+    index_path=INDEX_PATH,
+):
+    """
+    Індексує всі документи з директорії.
+    Кожні CHECKPOINT_EVERY файлів зберігає checkpoint; після падіння
+    повторний запуск продовжує з нього.
+    """
     console.print(f"\n[bold blue]📚 Індексація документів з {data_dir}[/bold blue]\n")
 
     data_path = Path(data_dir)
@@ -32,30 +260,52 @@ def index_documents(preprocessor, embedder, storage, data_dir="data/raw"):
         console.print("[yellow]Документи не знайдено![/yellow]")
         return
 
-    all_chunks = []
-
-    for file_path in files:
-        console.print(f"📄 Обробка: {file_path.name}")
-
-        # Обробка документа
-        result = preprocessor.process_document(
-            str(file_path),
-            enable_chunking=True,
-            chunk_size=int(os.getenv("CHUNK_SIZE", 800)),
-            chunk_overlap=int(os.getenv("CHUNK_OVERLAP", 150)),
+    processed_files = _load_checkpoint(storage, index_path)
+    if processed_files:
+        console.print(
+            f"♻️  Знайдено checkpoint: {len(processed_files)} файлів вже оброблено"
         )
-
-        console.print(f"   ✅ Створено {len(result.chunks)} чанків")
-        all_chunks.extend(result.chunks)
-
-    # Векторизація
-    console.print(f"\n🔢 Векторизація {len(all_chunks)} чанків...")
-    embeddings = embedder.embed_batch(all_chunks)
+        files = [f for f in files if str(f) not in processed_files]
+
+    chunk_size = CONFIG.chunk_size
+    chunk_overlap = CONFIG.chunk_overlap
+
+    # Чанки надходять потоком; в пам'яті тримаємо не більше одного batch'а,
+    # а не весь корпус
+    buffer = []
+    # хеш тексту -> chunk_id (дедуплікація між документами); після відновлення
+    # з checkpoint заповнюється чанками, що вже є в storage
+    seen = {_text_digest(chunk.text): chunk.chunk_id for chunk in storage.iter_chunks()}
+    for file_path, chunks in _iter_file_chunks(
+        preprocessor, files, chunk_size, chunk_overlap, workers, executor
+    ):
+        num_chunks = 0
+        for chunk in chunks:
+            buffer.append(chunk)
+            num_chunks += 1
+            if len(buffer) >= EMBED_BATCH_SIZE:
+                _embed_and_store(embedder, storage, buffer, seen)
+                buffer = []
+
+        console.print(f"📄 {file_path.name}: ✅ Створено {num_chunks} чанків")
+        processed_files.add(str(file_path))
+
+        if len(processed_files) % CHECKPOINT_EVERY == 0:
+            # Checkpoint має містити всі чанки оброблених файлів
+            if buffer:
+                _embed_and_store(embedder, storage, buffer, seen)
+                buffer = []
+            _save_checkpoint(storage, index_path, processed_files)
+            console.print(f"💾 Checkpoint: {len(processed_files)} файлів")
+
+    # Залишок
+    if buffer:
+        _embed_and_store(embedder, storage, buffer, seen)
 
     # Збереження в storage
     console.print("💾 Збереження в векторну БД...")
-    storage.add(embeddings, all_chunks)
-    storage.save("data/indexes/knowledge_base")
+    storage.save(index_path)
+    _remove_checkpoint(index_path)
 
     stats = storage.get_stats()
     console.print(f"\n[bold green]✅ Індексація завершена![/bold green]")
@@ -126,6 +376,18 @@ def main():
         "--data-dir", default="data/raw", help="Директорія з документами"
     )
     parser.add_argument("--question", help="Запитання (для mode=query)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Кількість процесів/потоків для обробки документів (mode=index)",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["process", "thread"],
+        default="process",
+        help="Пул для обробки документів при --workers > 1",
+    )
 
     args = parser.parse_args()
 
@@ -134,25 +396,34 @@ def main():
     # Ініціалізація компонентів
     console.print("⚙️  Ініціалізація компонентів...")
 
-    preprocessor = PreprocessorFactory.create(worker="minimal", default_parser="auto")
+    preprocessor = get_preprocessor()
 
-    embedder = EmbedderFactory.create(
-        method="sbert",
-        model_name=os.getenv(
-            "EMBEDDER_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
-        ),
-        batch_size=int(os.getenv("EMBEDDER_BATCH_SIZE", 32)),
+    embedder = get_embedder(
+        CONFIG.embedder_model,
+        CONFIG.embedder_batch_size,
+        CONFIG.embedder_precision or "fp32",
     )
 
-    storage = FAISSStorage(dimension=384)
+    # model_name / precision embedder'а записуються в metadata індексу
+    storage = get_storage(
+        384,
+        embedder_info={"model_name": embedder.model_name, "precision": embedder.precision},
+    )
 
     if args.mode == "index":
         # Режим індексації
-        index_documents(preprocessor, embedder, storage, args.data_dir)
+        index_documents(
+            preprocessor,
+            embedder,
+            storage,
+            args.data_dir,
+            workers=args.workers,
+            executor=args.executor,
+        )
 
     else:
         # Завантажуємо існуючий індекс
-        index_path = "data/indexes/knowledge_base"
+        index_path = INDEX_PATH
         if not Path(f"{index_path}.faiss").exists():
             console.print(
                 "[red]❌ Індекс не знайдено! Спочатку запустіть --mode index[/red]"
@@ -163,15 +434,15 @@ def main():
         storage.load(index_path)
 
         # Створюємо LLM client
-        api_key = os.getenv("PERPLEXITY_API_KEY")
+        api_key = CONFIG.perplexity_api_key
         if not api_key:
             console.print("[red]❌ PERPLEXITY_API_KEY не встановлено![/red]")
             return
 
         llm_client = LLMClientFactory.create(
-            provider=os.getenv("LLM_PROVIDER", "perplexity"),
+            provider=CONFIG.llm_provider or "perplexity",
             api_key=api_key,
-            model=os.getenv("LLM_MODEL", "sonar"),
+            model=CONFIG.llm_model or "sonar",
         )
 
         # Створюємо AI Agent
@@ -179,10 +450,10 @@ def main():
             storage=storage,
             embedder=embedder,
             llm_client=llm_client,
-            top_k=int(os.getenv("TOP_K", 4)),
-            min_similarity=float(os.getenv("MIN_SIMILARITY", 0.3)),
-            temperature=float(os.getenv("LLM_TEMPERATURE", 0.1)),
-            max_tokens=int(os.getenv("LLM_MAX_TOKENS", 800)),
+            top_k=CONFIG.top_k,
+            min_similarity=CONFIG.min_similarity,
+            temperature=CONFIG.llm_temperature,
+            max_tokens=CONFIG.llm_max_tokens,
             language="uk",
         )
 
@@ -1,10 +1,12 @@
 import os
+import logging
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from langserve import add_routes
 from langchain_core.runnables import RunnableLambda
-import pprint
 
+from config.settings import load_config
 from src.embeddings.embedder import EmbedderFactory
 from src.storage.storage import FAISSStorage
 from src.agent.agent import AIAgent
@@ -12,114 +14,155 @@ from src.agent.llm_client import LLMClientFactory
 
 # Завантаження змінних середовища
 load_dotenv()
+CONFIG = load_config()
+
+logger = logging.getLogger(__name__)
 
 # Ініціалізація компонентів
-embedder = EmbedderFactory.create(
-    method="sbert",
-    model_name=os.getenv("EMBEDDER_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
-    batch_size=int(os.getenv("EMBEDDER_BATCH_SIZE", 32)),
+# Явно задані параметри embedder'а: при завантаженні індексу розбіжність
+# з embedder'ом, яким індекс створено, логується
+_embedder_config = {
+    "model_name": CONFIG.embedder_model,
+    "precision": CONFIG.embedder_precision,
+}
+storage = FAISSStorage(
+    dimension=384,
+    index_type="flat",
+    embedder_info={k: v for k, v in _embedder_config.items() if v},
 )
-
-storage = FAISSStorage(dimension=384)
 index_path = "data/indexes/knowledge_base"
-if os.path.exists(f"{index_path}.faiss"):
+index_exists = os.path.exists(f"{index_path}.faiss")
+if index_exists:
     storage.load(index_path)
 else:
     print("Warning: Index not found. Please run 'python main.py --mode index' first.")
 
+embedder = EmbedderFactory.create(
+    method="sbert",
+    model_name=CONFIG.embedder_model,
+    batch_size=CONFIG.embedder_batch_size,
+    # Запити векторизуються з тією ж точністю, що й документи індексу
+    # (int8 / fp16 для запитів - лише якщо явно задано в конфігурації)
+    precision=CONFIG.embedder_precision or storage.embedder_info.get("precision", "fp32"),
+    compile_model=CONFIG.embedder_compile,
+)
+
 # Використовуємо Ollama
 llm_client = LLMClientFactory.create(
     provider="ollama",
-    model=os.getenv("LLM_MODEL", "qwen2.5:7b"),
-    temperature=float(os.getenv("LLM_TEMPERATURE", 0.1)),
+    model=CONFIG.llm_model or "qwen2.5:7b",
+    temperature=CONFIG.llm_temperature,
 )
 
 agent = AIAgent(
     storage=storage,
     embedder=embedder,
     llm_client=llm_client,
-    top_k=int(os.getenv("TOP_K", 4)),
-    min_similarity=float(os.getenv("MIN_SIMILARITY", 0.3)),
-    temperature=float(os.getenv("LLM_TEMPERATURE", 0.1)),
-    max_tokens=int(os.getenv("LLM_MAX_TOKENS", 800)),
+    top_k=CONFIG.top_k,
+    min_similarity=CONFIG.min_similarity,
+    temperature=CONFIG.llm_temperature,
+    max_tokens=CONFIG.llm_max_tokens,
     language="uk",
+    query_cache_path=CONFIG.query_cache_path,
 )
 
+if index_exists:
+    # Прогрів тим самим шляхом, що й запити (embed_single + пошук у FAISS):
+    # перший forward pass виконується при старті, а не на першому HTTP запиті
+    agent.retriever.retrieve("warmup", top_k=1)
+
 # Створення FastAPI додатку
 app = FastAPI(
     title="RAG System API",
     version="1.0",
     description="API for RAG System using LangChain & Ollama",
+    default_response_class=ORJSONResponse,
 )
 
 
 # Адаптер для LangServe
-def run_agent(input_data: dict) -> str:
+# Ключі, під якими LangServe / Playground може передати запит
+# ('undefined' - Playground іноді надсилає дані з цим ключем)
+_QUERY_KEYS = ("input", "messages", "question", "undefined", "content")
+
+
+def _from_dict(data: dict):
+    """Повертає значення першого відомого ключа з запитом"""
+    for key in _QUERY_KEYS:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _from_list(messages: list) -> str:
+    """Шукає останнє повідомлення від користувача в списку повідомлень"""
+    for msg in reversed(messages):
+        # LangChain Message object
+        if hasattr(msg, "content"):
+            if getattr(msg, "type", "") in ("human", "user"):
+                return msg.content
+        # Dictionary representation
+        elif isinstance(msg, dict):
+            if (msg.get("type") or msg.get("role")) in ("human", "user"):
+                return msg.get("content", "")
+        # String
+        elif isinstance(msg, str):
+            return msg
+    return ""
+
+
+# Витягування "сирого" запиту залежно від типу вхідних даних
+_EXTRACTORS = {
+    str: lambda x: x,
+    list: lambda x: x,
+    dict: _from_dict,
+}
+
+# Нормалізація запиту до рядка
+_NORMALIZERS = {
+    str: lambda x: x,
+    list: _from_list,
+}
+
+
+def _no_query(_):
+    return None
+
+
+def _dispatch(table: dict, value):
+    """
+    Обробник з table за type(value); при промаху - перший тип,
+    для якого isinstance (підкласи: OrderedDict, str-enum, ...)
+    """
+    handler = table.get(type(value))
+    if handler is None:
+        handler = next(
+            (h for cls, h in table.items() if isinstance(value, cls)), _no_query
+        )
+    return handler
+
+
+async def run_agent(input_data: dict) -> str:
     """
     Обгортка для виклику агента.
     Обробляє різні формати вхідних даних від LangServe.
     """
-    print(f"DEBUG: Input data type: {type(input_data)}")
-    print("DEBUG: Input data:")
-    pprint.pprint(input_data)
-
-    raw_query = None
+    logger.debug("Input data (%s): %r", type(input_data), input_data)
 
     # 1. Визначаємо де лежить запит/повідомлення
-    if isinstance(input_data, dict):
-        if "input" in input_data:
-            raw_query = input_data["input"]
-        elif "messages" in input_data:
-            raw_query = input_data["messages"]
-        elif "question" in input_data:
-            raw_query = input_data["question"]
-        elif "undefined" in input_data:
-            # LangServe Playground іноді надсилає дані з ключем 'undefined'
-            raw_query = input_data["undefined"]
-        # Fallback: якщо це dict, але немає відомих ключів
-        elif not raw_query:
-            if "content" in input_data:
-                raw_query = input_data["content"]
-    elif isinstance(input_data, list):
-        raw_query = input_data
+    raw_query = _dispatch(_EXTRACTORS, input_data)(input_data)
 
     # 2. Витягуємо текст запиту
-    final_query = ""
-
-    if isinstance(raw_query, str):
-        final_query = raw_query
-    elif isinstance(raw_query, list):
-        print(f"DEBUG: Processing list of {len(raw_query)} items")
-        # Якщо це список повідомлень, шукаємо останнє повідомлення від користувача
-        for i, msg in enumerate(reversed(raw_query)):
-            print(f"DEBUG: Checking item {i}: {type(msg)}")
-            # LangChain Message object
-            if hasattr(msg, "content"):
-                msg_type = getattr(msg, "type", "")
-                print(f"DEBUG: Item is object with content. Type: {msg_type}")
-                if msg_type == "human" or msg_type == "user":
-                    final_query = msg.content
-                    break
-            # Dictionary representation
-            elif isinstance(msg, dict):
-                msg_type = msg.get("type") or msg.get("role")
-                print(f"DEBUG: Item is dict. Type: {msg_type}")
-                if msg_type in ["human", "user"]:
-                    final_query = msg.get("content", "")
-                    break
-            # String
-            elif isinstance(msg, str):
-                print("DEBUG: Item is string")
-                final_query = msg
-                break
-
-    print(f"DEBUG: Extracted query: '{final_query}'")
+    final_query = _dispatch(_NORMALIZERS, raw_query)(raw_query) or ""
+
+    logger.debug("Extracted query: %r", final_query)
 
     if not final_query:
         return "Error: Could not extract query from input. Please check server logs."
 
-    # Викликаємо метод answer
-    response = agent.answer(final_query)
+    # Викликаємо async метод answer (не блокує event loop)
+    response = await agent.aanswer(final_query)
     return response.answer
 
 
@@ -1,8 +1,8 @@
+import asyncio
 import logging
 import time
-from typing import List, Dict, TypedDict
-
-from langgraph.graph import StateGraph, END
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 from src.models import AgentResponse, SearchResult
 from src.storage.storage import IStorage
@@ -14,18 +14,10 @@ from src.agent.llm_client import LLMClient
 logger = logging.getLogger(__name__)
 
 
-class AgentState(TypedDict):
-    query: str
-    documents: List[SearchResult]
-    answer: str
-    system_prompt: str
-    user_prompt: str
-
-
 class AIAgent:
     """
     AI Agent для обробки запитів у RAG системі.
-    Використовує LangGraph для оркестрації.
+    Лінійний pipeline: retrieve -> build_prompt -> generate.
     """
 
     def __init__(
@@ -38,9 +30,12 @@ class AIAgent:
         temperature: float = 0.1,
         max_tokens: int = 500,
         language: str = "uk",
+        query_cache_path: Optional[str | Path] = None,
     ):
 
-        self.retriever = Retriever(storage, embedder, min_similarity)
+        self.retriever = Retriever(
+            storage, embedder, min_similarity, query_cache_path=query_cache_path
+        )
         self.prompt_builder = PromptBuilder(language)
         self.llm_client = llm_client
 
@@ -48,38 +43,12 @@ class AIAgent:
         self.temperature = temperature
         self.max_tokens = max_tokens
 
-        # Ініціалізація графа
-        self.workflow = self._build_graph()
-        logger.info(f"AIAgent (LangGraph) ініціалізовано")
-
-    def _build_graph(self) -> StateGraph:
-        """Створює граф обробки запиту"""
-        workflow = StateGraph(AgentState)
-
-        # Додаємо вузли
-        workflow.add_node("retrieve", self._retrieve_node)
-        workflow.add_node("build_prompt", self._build_prompt_node)
-        workflow.add_node("generate", self._generate_node)
-
-        # Визначаємо ребра
-        workflow.set_entry_point("retrieve")
-        workflow.add_edge("retrieve", "build_prompt")
-        workflow.add_edge("build_prompt", "generate")
-        workflow.add_edge("generate", END)
-
-        return workflow.compile()
-
-    def _retrieve_node(self, state: AgentState) -> Dict:
-        """Вузол пошуку документів"""
-        query = state["query"]
-        results = self.retriever.retrieve(query, top_k=self.top_k)
-        return {"documents": results}
-
-    def _build_prompt_node(self, state: AgentState) -> Dict:
-        """Вузол створення промпту"""
-        query = state["query"]
-        documents = state["documents"]
+        logger.info("AIAgent ініціалізовано")
 
+    def _build_prompt(
+        self, query: str, documents: List[SearchResult]
+    ) -> Tuple[str, str]:
+        """Створює (system_prompt, user_prompt) для запиту"""
         if not documents:
             sys_prompt, user_prompt = self.prompt_builder.build_no_context_prompt(query)
         else:
@@ -87,66 +56,100 @@ class AIAgent:
                 query, documents
             )
 
-        return {"system_prompt": sys_prompt, "user_prompt": user_prompt}
+        return sys_prompt, user_prompt
 
-    def _generate_node(self, state: AgentState) -> Dict:
-        """Вузол генерації відповіді"""
-        answer = self.llm_client.generate(
-            system_prompt=state["system_prompt"],
-            user_prompt=state["user_prompt"],
+    def _generate(self, system_prompt: str, user_prompt: str) -> str:
+        """Генерує відповідь через LLM"""
+        return self.llm_client.generate(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
         )
-        return {"answer": answer}
+
+    def _make_response(
+        self,
+        query: str,
+        answer: str,
+        documents: List[SearchResult],
+        scores,
+        duration: float,
+    ) -> AgentResponse:
+        """Формує AgentResponse з метаданими"""
+        return AgentResponse(
+            answer=answer,
+            sources=documents,
+            query=query,
+            metadata={
+                "duration_seconds": round(duration, 2),
+                "num_sources": len(documents),
+                "avg_similarity": (
+                    round(float(scores.mean()), 3) if scores.size else 0
+                ),
+            },
+        )
+
+    def _make_error_response(self, query: str, error: Exception) -> AgentResponse:
+        logger.error("Помилка при обробці запиту: %s", str(error))
+        return AgentResponse(
+            answer=f"Вибачте, виникла помилка: {str(error)}",
+            sources=[],
+            query=query,
+            metadata={"error": str(error)},
+        )
 
     def answer(self, query: str) -> AgentResponse:
         """
-        Обробляє запит користувача через граф.
+        Обробляє запит користувача.
         """
-        logger.info(f"Обробка запиту: '{query}'")
+        logger.info("Обробка запиту: '%s'", query)
         start_time = time.time()
 
         try:
-            # Запуск графа
-            initial_state = {
-                "query": query,
-                "documents": [],
-                "answer": "",
-                "system_prompt": "",
-                "user_prompt": "",
-            }
-            final_state = self.workflow.invoke(initial_state)
+            # 1. Пошук документів
+            documents, scores = self.retriever.retrieve_with_scores(
+                query, top_k=self.top_k
+            )
+
+            # 2. Створення промпту
+            system_prompt, user_prompt = self._build_prompt(query, documents)
+
+            # 3. Генерація відповіді
+            answer = self._generate(system_prompt, user_prompt)
 
             duration = time.time() - start_time
+            logger.info("Відповідь згенеровано за %.2fs", duration)
+            return self._make_response(query, answer, documents, scores, duration)
+
+        except Exception as e:
+            return self._make_error_response(query, e)
 
-            # Формування відповіді
-            response = AgentResponse(
-                answer=final_state["answer"],
-                sources=final_state["documents"],
-                query=query,
-                metadata={
-                    "duration_seconds": round(duration, 2),
-                    "num_sources": len(final_state["documents"]),
-                    "avg_similarity": (
-                        round(
-                            sum(r.score for r in final_state["documents"])
-                            / len(final_state["documents"]),
-                            3,
-                        )
-                        if final_state["documents"]
-                        else 0
-                    ),
-                },
+    async def aanswer(self, query: str) -> AgentResponse:
+        """
+        Асинхронна версія answer(): пошук (CPU) виконується в окремому потоці,
+        генерація - через неблокуючий llm_client.agenerate, тож один event loop
+        може обслуговувати багато запитів одночасно.
+        """
+        logger.info("Обробка запиту (async): '%s'", query)
+        start_time = time.time()
+
+        try:
+            documents, scores = await asyncio.to_thread(
+                self.retriever.retrieve_with_scores, query, self.top_k
             )
 
-            logger.info(f"Відповідь згенеровано за {duration:.2f}s")
-            return response
+            system_prompt, user_prompt = self._build_prompt(query, documents)
 
-        except Exception as e:
-            logger.error(f"Помилка при обробці запиту: {str(e)}")
-            return AgentResponse(
-                answer=f"Вибачте, виникла помилка: {str(e)}",
-                sources=[],
-                query=query,
-                metadata={"error": str(e)},
+            answer = await self.llm_client.agenerate(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
             )
+
+            duration = time.time() - start_time
+            logger.info("Відповідь згенеровано за %.2fs", duration)
+            return self._make_response(query, answer, documents, scores, duration)
+
+        except Exception as e:
+            return self._make_error_response(query, e)
@@ -1,16 +1,34 @@
-from typing import Optional
+from typing import Final, Iterator, Optional
 import logging
+import threading
 
 from langchain.agents import create_agent
 from langchain_ollama import ChatOllama
 from langchain_core.tools import Tool
 from langchain_community.vectorstores import FAISS
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 
+from src.agent.semantic_cache import SemanticCache
 from src.storage.langchain_adapter import FAISSLangChainAdapter
 
 logger = logging.getLogger(__name__)
 
+_SYSTEM_PROMPT_UK: Final[str] = """Ти — експертний асистент, який відповідає на запитання на основі наданих документів.
+
+ПРАВИЛА:
+1. ЗАВЖДИ використовуй інструмент search_knowledge_base для пошуку інформації перед відповіддю
+2. Давай точні відповіді ЛИШЕ на основі знайденого контексту
+3. Якщо інформації недостатньо, чесно скажи про це
+4. НЕ вигадуй факти, яких немає в документах
+5. Відповідай УКРАЇНСЬКОЮ мовою
+6. Посилайся на джерела через [Джерело 1], [Джерело 2] тощо
+7. Структуруй відповідь логічно та зрозуміло
+
+Приклад хорошої відповіді:
+"Машинне навчання — це підгалузь штучного інтелекту [Джерело 1]. 
+Воно дозволяє комп'ютерам вчитися на даних без явного програмування [Джерело 2]."
+"""
+
 
 class RAGAgent:
     """
@@ -24,6 +42,10 @@ class RAGAgent:
         model: str = "qwen2.5:7b",
         temperature: float = 0.1,
         top_k: int = 4,
+        ef_search: int = 64,
+        semantic_cache_threshold: Optional[float] = None,
+        semantic_cache_ttl: Optional[float] = None,
+        semantic_cache_max_entries: int = 1000,
     ):
         """
         Args:
@@ -31,8 +53,15 @@ class RAGAgent:
             model: Ollama модель (qwen2.5:7b, llama3.1:8b, etc.)
             temperature: Креативність (0-1, 0.1 для точності)
             top_k: Кількість релевантних чанків для retrieval
+            ef_search: Ширина пошуку HNSW (більше = точніше, повільніше)
+            semantic_cache_threshold: Поріг cosine similarity для семантичного
+                                      кешу відповідей (None = кеш вимкнено, за замовчуванням;
+                                      близькі перефразування, напр. з різними роками,
+                                      отримають одну відповідь - вмикати свідомо, напр. 0.92)
+            semantic_cache_ttl: Час життя записів кешу в секундах (None = безстроково)
+            semantic_cache_max_entries: Максимум записів семантичного кешу
         """
-        logger.info(f"Ініціалізація RAG Agent з моделлю {model}")
+        logger.info("Ініціалізація RAG Agent з моделлю %s", model)
 
         self.top_k = top_k
 
@@ -41,12 +70,30 @@ class RAGAgent:
             model=model,
             temperature=temperature,
             num_ctx=4096,  # Context window
+            num_predict=512,  # Ліміт токенів відповіді
+            keep_alive="30m",  # Модель лишається в пам'яті між запитами
+            streaming=True,
         )
         logger.info("✅ Ollama LLM підключено")
 
+        # Прогрів у фоні: Ollama завантажує модель при першому виклику
+        threading.Thread(target=self._warmup_llm, daemon=True).start()
+
         # 2. Завантажуємо FAISS vectorstore
-        self.vectorstore = FAISSLangChainAdapter.load_faiss(faiss_index_path)
-        logger.info(f"✅ FAISS індекс завантажено: {faiss_index_path}")
+        self.vectorstore = FAISSLangChainAdapter.load_faiss(
+            faiss_index_path, ef_search=ef_search
+        )
+        logger.info("✅ FAISS індекс завантажено: %s", faiss_index_path)
+
+        # Семантичний кеш відповідей (використовує ті ж embeddings, що й vectorstore)
+        self.semantic_cache: Optional[SemanticCache] = None
+        if semantic_cache_threshold is not None:
+            self.semantic_cache = SemanticCache(
+                dimension=self.vectorstore.index.d,
+                threshold=semantic_cache_threshold,
+                ttl_seconds=semantic_cache_ttl,
+                max_entries=semantic_cache_max_entries,
+            )
 
         # 3. Створюємо retrieval tool
         retriever_tool = Tool(
@@ -67,6 +114,14 @@ class RAGAgent:
         )
         logger.info("✅ LangChain Agent створено")
 
+    def _warmup_llm(self) -> None:
+        """Мінімальний виклик LLM, щоб модель була завантажена до першого запиту"""
+        try:
+            self.llm.invoke([HumanMessage(content="hi")])
+            logger.info("✅ Ollama модель прогріта")
+        except Exception as e:
+            logger.warning("Не вдалося прогріти Ollama модель: %s", e)
+
     def _search_knowledge_base(self, query: str) -> str:
         """
         Tool function для пошуку в knowledge base.
@@ -77,7 +132,7 @@ class RAGAgent:
         Returns:
             Контекст з релевантних документів
         """
-        logger.info(f"Пошук в knowledge base: '{query[:50]}...'")
+        logger.info("Пошук в knowledge base: '%s...'", query[:50])
 
         # Пошук релевантних документів
         docs = self.vectorstore.similarity_search(query, k=self.top_k)
@@ -86,32 +141,16 @@ class RAGAgent:
             return "Релевантної інформації не знайдено в документах."
 
         # Формуємо контекст
-        context_parts = []
-        for i, doc in enumerate(docs, 1):
-            context_parts.append(f"[Джерело {i}]\n{doc.page_content}")
-
-        context = "\n\n".join(context_parts)
-        logger.info(f"Знайдено {len(docs)} релевантних фрагментів")
+        context = "\n\n".join(
+            f"[Джерело {i}]\n{doc.page_content}" for i, doc in enumerate(docs, 1)
+        )
+        logger.info("Знайдено %s релевантних фрагментів", len(docs))
 
         return context
 
     def _get_system_prompt(self) -> str:
         """Системний промпт для агента (українською)"""
-        return """Ти — експертний асистент, який відповідає на запитання на основі наданих документів.
-
-ПРАВИЛА:
-1. ЗАВЖДИ використовуй інструмент search_knowledge_base для пошуку інформації перед відповіддю
-2. Давай точні відповіді ЛИШЕ на основі знайденого контексту
-3. Якщо інформації недостатньо, чесно скажи про це
-4. НЕ вигадуй факти, яких немає в документах
-5. Відповідай УКРАЇНСЬКОЮ мовою
-6. Посилайся на джерела через [Джерело 1], [Джерело 2] тощо
-7. Структуруй відповідь логічно та зрозуміло
-
-Приклад хорошої відповіді:
-"Машинне навчання — це підгалузь штучного інтелекту [Джерело 1]. 
-Воно дозволяє комп'ютерам вчитися на даних без явного програмування [Джерело 2]."
-"""
+        return _SYSTEM_PROMPT_UK
 
     def query(self, question: str) -> dict:
         """
@@ -123,9 +162,23 @@ class RAGAgent:
         Returns:
             Dict з відповіддю та метаданими
         """
-        logger.info(f"Обробка запиту: '{question}'")
+        logger.info("Обробка запиту: '%s'", question)
 
         try:
+            question_vector = None
+            if self.semantic_cache is not None:
+                question_vector = self.vectorstore.embedding_function.embed_query(
+                    question
+                )
+                cached_answer = self.semantic_cache.get(question_vector)
+                if cached_answer is not None:
+                    return {
+                        "answer": cached_answer,
+                        "question": question,
+                        "num_messages": 0,
+                        "cached": True,
+                    }
+
             # Викликаємо агента
             response = self.agent.invoke(
                 {"messages": [{"role": "user", "content": question}]}
@@ -150,6 +203,9 @@ class RAGAgent:
 
             logger.info("✅ Відповідь згенеровано")
 
+            if self.semantic_cache is not None:
+                self.semantic_cache.add(question_vector, question, answer)
+
             return {
                 "answer": answer,
                 "question": question,
@@ -157,14 +213,14 @@ class RAGAgent:
             }
 
         except Exception as e:
-            logger.error(f"Помилка при обробці запиту: {e}")
+            logger.error("Помилка при обробці запиту: %s", e)
             return {
                 "answer": f"Помилка: {str(e)}",
                 "error": str(e),
                 "question": question,
             }
 
-    def stream_query(self, question: str):
+    def stream_query(self, question: str) -> Iterator[str | dict]:
         """
         Streaming відповідь (для майбутньої інтеграції з UI).
 
@@ -172,13 +228,16 @@ class RAGAgent:
             question: Запитання користувача
 
         Yields:
-            Частини відповіді
+            Текстові дельти відповіді (токени LLM) або {"error": ...}
         """
         try:
-            for chunk in self.agent.stream(
-                {"messages": [{"role": "user", "content": question}]}
+            for message, _ in self.agent.stream(
+                {"messages": [{"role": "user", "content": question}]},
+                stream_mode="messages",
             ):
-                yield chunk
+                # Лише текст моделі (без викликів tools та їх результатів)
+                if getattr(message, "type", None) == "AIMessageChunk" and message.content:
+                    yield message.content
         except Exception as e:
-            logger.error(f"Помилка при streaming: {e}")
+            logger.error("Помилка при streaming: %s", e)
             yield {"error": str(e)}
@@ -1,6 +1,13 @@
 from abc import ABC, abstractmethod
+import asyncio
 import logging
 import time
+from typing import List, Optional, Sequence, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from langchain_ollama import ChatOllama
 from langchain_core.messages import SystemMessage, HumanMessage
 
@@ -21,6 +28,62 @@ class LLMClient(ABC):
         """Генерує відповідь від LLM"""
         pass
 
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 500,
+    ) -> str:
+        """
+        Асинхронна генерація. За замовчуванням запускає синхронний
+        `generate` в окремому потоці через asyncio.to_thread.
+        Клієнти з нативним async I/O перевизначають цей метод.
+        """
+        return await asyncio.to_thread(
+            self.generate, system_prompt, user_prompt, temperature, max_tokens
+        )
+
+    async def aclose(self) -> None:
+        """Звільняє async-ресурси клієнта (за замовчуванням нічого)"""
+        pass
+
+    async def _agenerate_many(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        temperature: float,
+        max_tokens: int,
+    ) -> List[str]:
+        try:
+            return await asyncio.gather(
+                *(
+                    self.agenerate(system_prompt, user_prompt, temperature, max_tokens)
+                    for system_prompt, user_prompt in pairs
+                )
+            )
+        finally:
+            await self.aclose()
+
+    def generate_batch(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        temperature: float = 0.1,
+        max_tokens: int = 500,
+    ) -> List[str]:
+        """
+        Генерує відповіді для пачки (system_prompt, user_prompt) паралельно:
+        усі запити запускаються через asyncio.gather, тож мережеві затримки
+        перекриваються замість послідовного очікування.
+
+        Викликається з синхронного коду (поза event loop).
+
+        Returns:
+            Відповіді у тому ж порядку, що й pairs
+        """
+        if not pairs:
+            return []
+        return asyncio.run(self._agenerate_many(pairs, temperature, max_tokens))
+
 
 class PerplexityClient(LLMClient):
     """
@@ -42,8 +105,61 @@ class PerplexityClient(LLMClient):
         self.model = model
         self.timeout = timeout
         self.api_url = "https://api.perplexity.ai/chat/completions"
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
 
-        logger.info(f"PerplexityClient ініціалізовано. Модель: {model}")
+        # Заголовки спільні для всіх запитів: задаються на Session / AsyncClient
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+        # Одна Session на клієнт: keep-alive без TCP+TLS handshake на кожен запит
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3),
+        )
+        self._session.mount("https://", adapter)
+
+        logger.info("PerplexityClient ініціалізовано. Модель: %s", model)
+
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> dict:
+        """Повертає payload для запиту до API"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": 0.9,
+            "stream": False,
+        }
+
+    def _parse_response(self, result: dict, start_time: float) -> str:
+        """Витягує текст відповіді та логує статистику"""
+        answer = result["choices"][0]["message"]["content"]
+
+        usage = result.get("usage", {})
+        duration = time.time() - start_time
+
+        logger.info(
+            "Відповідь отримано за %.2fs. Токени: %s",
+            duration,
+            usage.get("total_tokens", "N/A"),
+        )
+
+        return answer.strip()
 
     def generate(
         self,
@@ -67,56 +183,101 @@ class PerplexityClient(LLMClient):
         Raises:
             Exception: При помилках API
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        payload = self._build_request(
+            system_prompt, user_prompt, temperature, max_tokens
+        )
 
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "top_p": 0.9,
-            "stream": False,
-        }
-
-        logger.info(f"Відправка запиту до Perplexity API (model={self.model})")
+        logger.info("Відправка запиту до Perplexity API (model=%s)", self.model)
         start_time = time.time()
 
         try:
-            response = requests.post(
-                self.api_url, headers=headers, json=payload, timeout=self.timeout
+            # Заголовки (Authorization) встановлені на session
+            response = self._session.post(
+                self.api_url, json=payload, timeout=self.timeout
             )
             response.raise_for_status()
 
-            result = response.json()
-            answer = result["choices"][0]["message"]["content"]
+            return self._parse_response(response.json(), start_time)
 
-            # Логуємо статистику
-            usage = result.get("usage", {})
-            duration = time.time() - start_time
+        except requests.exceptions.Timeout:
+            logger.error("Таймаут запиту до Perplexity API (%ss)", self.timeout)
+            raise Exception("LLM API таймаут. Спробуйте ще раз.")
 
-            logger.info(
-                f"Відповідь отримано за {duration:.2f}s. "
-                f"Токени: {usage.get('total_tokens', 'N/A')}"
+        except requests.exceptions.HTTPError as e:
+            logger.error(
+                "HTTP помилка: %s - %s",
+                e.response.status_code,
+                e.response.text,
             )
+            raise Exception(f"Помилка LLM API: {e.response.status_code}")
 
-            return answer.strip()
+        except Exception as e:
+            logger.error("Несподівана помилка: %s", str(e))
+            raise Exception(f"Помилка при зверненні до LLM: {str(e)}")
 
-        except requests.exceptions.Timeout:
-            logger.error(f"Таймаут запиту до Perplexity API ({self.timeout}s)")
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Один AsyncClient на event loop (пул з'єднань перевикористовується).
+        HTTP/2 мультиплексує паралельні запити в одному TCP з'єднанні.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            # Клієнт прив'язаний до loop, у якому створений (напр. після asyncio.run)
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout, http2=True, headers=self._headers
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Закриває AsyncClient поточного event loop"""
+        if (
+            self._async_client is not None
+            and self._async_client_loop is asyncio.get_running_loop()
+        ):
+            await self._async_client.aclose()
+        self._async_client = None
+        self._async_client_loop = None
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 500,
+    ) -> str:
+        """
+        Асинхронна версія generate() на httpx.AsyncClient (не блокує event loop).
+        """
+        payload = self._build_request(
+            system_prompt, user_prompt, temperature, max_tokens
+        )
+
+        logger.info("Відправка async запиту до Perplexity API (model=%s)", self.model)
+        start_time = time.time()
+
+        try:
+            response = await self._get_async_client().post(
+                self.api_url, json=payload
+            )
+            response.raise_for_status()
+
+            return self._parse_response(response.json(), start_time)
+
+        except httpx.TimeoutException:
+            logger.error("Таймаут запиту до Perplexity API (%ss)", self.timeout)
             raise Exception("LLM API таймаут. Спробуйте ще раз.")
 
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP помилка: {e.response.status_code} - {e.response.text}")
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                "HTTP помилка: %s - %s",
+                e.response.status_code,
+                e.response.text,
+            )
             raise Exception(f"Помилка LLM API: {e.response.status_code}")
 
         except Exception as e:
-            logger.error(f"Несподівана помилка: {str(e)}")
+            logger.error("Несподівана помилка: %s", str(e))
             raise Exception(f"Помилка при зверненні до LLM: {str(e)}")
 
 
@@ -130,7 +291,14 @@ class OllamaClient(LLMClient):
         self.model = model
         self.temperature = temperature
         self.llm = ChatOllama(model=model, temperature=temperature)
-        logger.info(f"OllamaClient ініціалізовано. Модель: {model}")
+        logger.info("OllamaClient ініціалізовано. Модель: %s", model)
+
+    def _bind(self, temperature: float, max_tokens: int):
+        """
+        Параметри генерації передаються на виклик (bind), а не через зміну
+        спільного self.llm: паралельні agenerate не перетирають температуру одне одного.
+        """
+        return self.llm.bind(temperature=temperature, num_predict=max_tokens)
 
     def generate(
         self,
@@ -142,7 +310,7 @@ class OllamaClient(LLMClient):
         """
         Генерує відповідь через Ollama.
         """
-        logger.info(f"Відправка запиту до Ollama (model={self.model})")
+        logger.info("Відправка запиту до Ollama (model=%s)", self.model)
         start_time = time.time()
 
         try:
@@ -151,20 +319,46 @@ class OllamaClient(LLMClient):
                 HumanMessage(content=user_prompt),
             ]
 
-            # Оновлюємо температуру якщо змінилась
-            if temperature != self.temperature:
-                self.llm.temperature = temperature
-
-            response = self.llm.invoke(messages)
+            response = self._bind(temperature, max_tokens).invoke(messages)
             answer = response.content
 
             duration = time.time() - start_time
-            logger.info(f"Відповідь отримано за {duration:.2f}s")
+            logger.info("Відповідь отримано за %.2fs", duration)
 
             return answer.strip()
 
         except Exception as e:
-            logger.error(f"Помилка Ollama: {str(e)}")
+            logger.error("Помилка Ollama: %s", str(e))
+            raise Exception(f"Помилка при зверненні до Ollama: {str(e)}")
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int = 500,
+    ) -> str:
+        """
+        Асинхронна генерація через Ollama (ChatOllama.ainvoke).
+        """
+        logger.info("Відправка async запиту до Ollama (model=%s)", self.model)
+        start_time = time.time()
+
+        try:
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=user_prompt),
+            ]
+
+            response = await self._bind(temperature, max_tokens).ainvoke(messages)
+
+            duration = time.time() - start_time
+            logger.info("Відповідь отримано за %.2fs", duration)
+
+            return response.content.strip()
+
+        except Exception as e:
+            logger.error("Помилка Ollama: %s", str(e))
             raise Exception(f"Помилка при зверненні до Ollama: {str(e)}")
 
 
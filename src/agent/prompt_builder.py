@@ -1,6 +1,21 @@
-from typing import List
+from typing import Dict, Final, List
 from src.models import SearchResult
 
+_SYSTEM_PROMPTS: Final[Dict[str, str]] = {
+    "uk":
+    """Ти — експертний асистент, який відповідає на запитання на основі наданих документів.
+
+Правила:
+- Давай точні та стислі відповіді українською мовою
+- Використовуй ЛИШЕ інформацію з наданого контексту
+- Якщо інформації недостатньо, чесно скажи про це
+- Не вигадуй факти, яких немає в контексті
+- Структуруй відповідь логічно та зрозуміло
+- Посилайся на контекст через номери [1], [2] тощо"""
+}
+
+_NO_CONTEXT_SYSTEM_PROMPT: Final[str] = """Ти — чесний асистент. Якщо у тебе немає інформації в документах, скажи про це прямо."""
+
 
 class PromptBuilder:
     """
@@ -13,18 +28,9 @@ class PromptBuilder:
             language: Мова відповідей ('uk', 'en')
         """
         self.language = language
-        self.system_prompts = {
-            "uk":
-            """Ти — експертний асистент, який відповідає на запитання на основі наданих документів.
-
-Правила:
-- Давай точні та стислі відповіді українською мовою
-- Використовуй ЛИШЕ інформацію з наданого контексту
-- Якщо інформації недостатньо, чесно скажи про це
-- Не вигадуй факти, яких немає в контексті
-- Структуруй відповідь логічно та зрозуміло
-- Посилайся на контекст через номери [1], [2] тощо"""
-        }
+        self.system_prompts = _SYSTEM_PROMPTS
+        # Системний промпт не залежить від запиту - обираємо один раз
+        self.system_prompt = _SYSTEM_PROMPTS.get(language, _SYSTEM_PROMPTS["uk"])
 
     def build_qa_prompt(self, query: str,
                         search_results: List[SearchResult]) -> tuple[str, str]:
@@ -38,19 +44,12 @@ class PromptBuilder:
         Returns:
             Tuple (system_prompt, user_prompt)
         """
-        # System prompt
-        system_prompt = self.system_prompts.get(self.language,
-                                                self.system_prompts["uk"])
-
-        # Формуємо контекст
-        context_parts = []
-        for i, result in enumerate(search_results, 1):
-            # Додаємо номер, score та текст
-            context_parts.append(
-                f"[{i}] (Релевантність: {result.score:.2f})\n{result.chunk.text.strip()}"
-            )
+        system_prompt = self.system_prompt
 
-        context_text = "\n\n".join(context_parts)
+        # Формуємо контекст: номер, score та текст
+        context_text = "\n\n".join(
+            f"[{i}] (Релевантність: {result.score:.2f})\n{result.chunk.text.strip()}"
+            for i, result in enumerate(search_results, 1))
 
         # User prompt
         user_prompt = f"""Контекст з документів:
@@ -69,7 +68,7 @@ class PromptBuilder:
         Returns:
             Tuple (system_prompt, user_prompt)
         """
-        system_prompt = """Ти — чесний асистент. Якщо у тебе немає інформації в документах, скажи про це прямо."""
+        system_prompt = _NO_CONTEXT_SYSTEM_PROMPT
 
         user_prompt = f"""Запитання: {query}
 
@@ -0,0 +1,68 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """
+    Персистентний (SQLite) кеш векторів запитів.
+    Переживає перезапуски server.py, тож повторні запити не потребують SBERT.
+    """
+
+    def __init__(self, db_path: str | Path, model_key: str):
+        """
+        Args:
+            db_path: Шлях до файлу SQLite
+            model_key: Ідентифікатор моделі (входить у ключ кешу)
+        """
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.model_key = model_key
+        self._lock = threading.Lock()
+
+        # Сервер викликає агента з різних потоків - доступ серіалізуємо через lock
+        self._conn = sqlite3.connect(
+            str(db_path), isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings "
+            "(key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+
+        logger.info("QueryEmbeddingCache відкрито: %s", db_path)
+
+    def _key(self, query: str) -> bytes:
+        return hashlib.sha1(f"{self.model_key}\0{query}".encode("utf-8")).digest()
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Повертає вектор запиту (float32, read-only view на blob) або None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vec FROM query_embeddings WHERE key = ?", (self._key(query),)
+            ).fetchone()
+
+        if row is None:
+            return None
+        # frombuffer над bytes - без копії і вже read-only, як embed_single у Retriever
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put(self, query: str, vector) -> None:
+        """Зберігає вектор запиту (float32)"""
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO query_embeddings (key, vec) VALUES (?, ?)",
+                (self._key(query), blob),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,9 +1,14 @@
 import logging
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
 
-from src.models import TextChunk, SearchResult
+import numpy as np
+
+from src.models import SearchResult, TextChunk
 from src.storage.storage import IStorage
 from src.embeddings.embedder import IEmbedder
+from src.agent.query_cache import QueryEmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,21 +19,92 @@ class Retriever:
     """
 
     def __init__(
-        self, storage: IStorage, embedder: IEmbedder, min_similarity: float = 0.3
+        self,
+        storage: IStorage,
+        embedder: IEmbedder,
+        min_similarity: float = 0.3,
+        cache_size: int = 1024,
+        query_cache_path: Optional[str | Path] = None,
     ):
         """
         Args:
             storage: Векторне сховище
             embedder: Embedder для векторизації запитів
             min_similarity: Мінімальний score для фільтрації (0-1)
+            cache_size: Розмір LRU кешу для векторів запитів та результатів пошуку
+            query_cache_path: Шлях до SQLite кешу векторів запитів (None = вимкнено)
         """
         self.storage = storage
         self.embedder = embedder
         self.min_similarity = min_similarity
 
+        self.query_cache = None
+        if query_cache_path is not None:
+            model_key = "{}:{}".format(
+                getattr(embedder, "model_name", type(embedder).__name__),
+                getattr(embedder, "precision", ""),
+            )
+            self.query_cache = QueryEmbeddingCache(query_cache_path, model_key)
+
+        # Кеші прив'язані до екземпляра (і, відповідно, до одного embedder'а)
+        self._embed_query = lru_cache(maxsize=cache_size)(self._embed_query_uncached)
+        self._search_cached = lru_cache(maxsize=cache_size)(self._search_uncached)
+
+    def _embed_query_uncached(self, query: str) -> np.ndarray:
+        """
+        Векторизує текст запиту (з урахуванням персистентного кешу).
+        Кеш ключується рядком запиту; вектор - read-only float32, спільний для всіх попадань.
+        """
+        if self.query_cache is not None:
+            vector = self.query_cache.get(query)
+            if vector is not None:
+                return vector
+
+        vector = np.asarray(self.embedder.embed_single(query), dtype=np.float32)
+        vector.flags.writeable = False
+
+        if self.query_cache is not None:
+            self.query_cache.put(query, vector)
+        return vector
+
+    def _search_uncached(
+        self, query: str, top_k: int, min_similarity: float, storage_version: int
+    ) -> Tuple[Tuple[SearchResult, ...], np.ndarray]:
+        """
+        Пошук в storage з фільтрацією за min_similarity.
+        storage_version входить лише в ключ кешу: після add/load/clear storage
+        результати шукаються заново.
+        """
+        # 1. Векторизуємо запит
+        query_vector = self._embed_query(query)
+
+        # 2. Шукаємо в storage
+        results = self.storage.search(query_vector, top_k=top_k)
+
+        # 3. Фільтруємо за min_similarity
+        filtered_results = [r for r in results if r.score >= min_similarity]
+
+        logger.info(
+            "Знайдено %s результатів, після фільтрації: %s",
+            len(results),
+            len(filtered_results),
+        )
+
+        # Scores одним масивом - для векторних агрегатів (mean, sum, ...)
+        scores = np.array([r.score for r in filtered_results], dtype=np.float32)
+        scores.flags.writeable = False
+
+        return tuple(filtered_results), scores
+
+    def clear_cache(self) -> None:
+        """Очищає кеші (наприклад, після оновлення індексу)"""
+        self._embed_query.cache_clear()
+        self._search_cached.cache_clear()
+
     def retrieve(self, query: str, top_k: int = 4) -> List[SearchResult]:
         """
         Знаходить релевантні фрагменти для запиту.
+        Повторні запити обслуговуються з LRU кешу.
 
         Args:
             query: Текст запиту
@@ -37,23 +113,52 @@ class Retriever:
         Returns:
             Список SearchResult, відсортований за релевантністю
         """
-        logger.info(f"Пошук релевантних чанків для запиту: '{query[:50]}...'")
+        results, _ = self.retrieve_with_scores(query, top_k=top_k)
+        return results
 
-        # 1. Векторизуємо запит
-        query_chunk = TextChunk(
-            text=query, chunk_id="query", document_id="query", chunk_index=0
+    def retrieve_with_scores(
+        self, query: str, top_k: int = 4
+    ) -> Tuple[List[SearchResult], np.ndarray]:
+        """
+        Як retrieve(), але додатково повертає scores у вигляді np.ndarray
+        (у тому ж порядку, що й результати).
+
+        Returns:
+            Tuple (список SearchResult, масив scores float32)
+        """
+        logger.info("Пошук релевантних чанків для запиту: '%s...'", query[:50])
+
+        results, scores = self._search_cached(
+            query, top_k, self.min_similarity, self.storage.version
         )
-        query_embedding = self.embedder.embed(query_chunk)
+        return list(results), scores
 
-        # 2. Шукаємо в storage
-        results = self.storage.search(query_embedding.vector, top_k=top_k)
+    def retrieve_many(
+        self, queries: List[str], top_k: int = 4
+    ) -> List[List[SearchResult]]:
+        """
+        Пошук для множини запитів: одна batch векторизація та один
+        виклик storage.search_batch замість N окремих retrieve().
 
-        # 3. Фільтруємо за min_similarity
-        filtered_results = [r for r in results if r.score >= self.min_similarity]
+        Returns:
+            Список результатів для кожного запиту (у тому ж порядку)
+        """
+        if not queries:
+            return []
 
-        logger.info(
-            f"Знайдено {len(results)} результатів, "
-            f"після фільтрації: {len(filtered_results)}"
+        logger.info("Batch пошук для %s запитів", len(queries))
+
+        chunks = [
+            TextChunk(text=query, chunk_id=f"query_{i}", document_id="query")
+            for i, query in enumerate(queries)
+        ]
+        query_vectors = np.ascontiguousarray(
+            self.embedder.embed_matrix(chunks), dtype=np.float32
         )
 
-        return filtered_results
+        batch_results = self.storage.search_batch(query_vectors, top_k=top_k)
+
+        return [
+            [r for r in results if r.score >= self.min_similarity]
+            for results in batch_results
+        ]
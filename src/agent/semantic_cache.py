@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Семантичний кеш відповідей: схожі за змістом запитання (cosine similarity
+    вище порогу) отримують збережену відповідь без повторного виклику LLM.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        threshold: float = 0.92,
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = 1000,
+    ):
+        """
+        Args:
+            dimension: Розмірність векторів запитань
+            threshold: Мінімальна cosine similarity для попадання в кеш
+            ttl_seconds: Час життя запису (None = без обмеження)
+            max_entries: Максимум записів; найстаріші витісняються першими
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._index = faiss.IndexFlatIP(dimension)
+        self._entries: List[Tuple[str, str, float]] = []  # (question, answer, created_at)
+        self._lock = threading.Lock()
+
+        logger.info(
+            "SemanticCache ініціалізовано: threshold=%s, ttl=%s, max_entries=%s",
+            threshold,
+            ttl_seconds,
+            max_entries,
+        )
+
+    @staticmethod
+    def _prepare(vector) -> np.ndarray:
+        vector = np.array(vector, dtype=np.float32, order="C").reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def get(self, vector) -> Optional[str]:
+        """Повертає збережену відповідь для найближчого запитання або None"""
+        query = self._prepare(vector)
+
+        with self._lock:
+            if self._index.ntotal == 0:
+                return None
+
+            scores, indices = self._index.search(query, 1)
+            score, idx = float(scores[0][0]), int(indices[0][0])
+
+            if idx == -1 or score < self.threshold:
+                return None
+
+            question, answer, created_at = self._entries[idx]
+
+            if (
+                self.ttl_seconds is not None
+                and time.time() - created_at > self.ttl_seconds
+            ):
+                # Прострочений запис видаляємо (IndexFlat зсуває id так само, як list)
+                self._index.remove_ids(np.array([idx], dtype=np.int64))
+                del self._entries[idx]
+                return None
+
+        logger.info("Semantic cache hit (%.3f): '%s...'", score, question[:50])
+        return answer
+
+    def add(self, vector, question: str, answer: str) -> None:
+        """Додає пару (запитання, відповідь) у кеш"""
+        query = self._prepare(vector)
+
+        with self._lock:
+            overflow = len(self._entries) + 1 - self.max_entries
+            if overflow > 0:
+                # Записи додаються в хронологічному порядку: найстаріші - на початку
+                self._index.remove_ids(np.arange(overflow, dtype=np.int64))
+                del self._entries[:overflow]
+
+            self._index.add(query)
+            self._entries.append((question, answer, time.time()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index.reset()
+            self._entries.clear()
@@ -1,14 +1,75 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+import hashlib
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import requests
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.models import Normalize, Pooling
+from sentence_transformers.util import batch_to_device
+import threading
+import torch
 import logging
 
-from src.models import TextChunk, EmbedderResult
+from src.models import BatchEmbedderResult, TextChunk, EmbedderMeta, EmbedderResult
 
 logger = logging.getLogger(__name__)
 
+# (джерело моделі, device, precision, compile, max_seq_length) ->
+# (SentenceTransformer, precision, fused encoder)
+_MODEL_CACHE: Dict[Tuple[str, str, str, bool, Optional[int]],
+                   Tuple[SentenceTransformer, str, Optional[torch.nn.Module]]] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# Скільки токенізованих батчів готується наперед, поки модель рахує поточний
+_TOKENIZE_PREFETCH = 2
+
+
+def _configure_cpu_threads() -> None:
+    """Потоки torch для CPU inference (intra-op GEMM та inter-op)"""
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // 2))
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        # Дозволено лише до першої паралельної роботи torch
+        pass
+
+
+# Входи HF трансформера, які передаються з features SentenceTransformer.tokenize()
+_TRANSFORMER_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+
+class _MeanPoolEncoder(torch.nn.Module):
+    """
+    Transformer -> mean pooling за attention_mask -> L2 normalize одним forward
+    (без pipeline модулів SentenceTransformer та проміжного dict на кожен модуль).
+    """
+
+    def __init__(self, transformer: torch.nn.Module):
+        super().__init__()
+        self.transformer = transformer
+
+    def forward(self, features: Dict[str, torch.Tensor]) -> torch.Tensor:
+        inputs = {k: features[k] for k in _TRANSFORMER_INPUTS if k in features}
+        hidden = self.transformer(**inputs, return_dict=True).last_hidden_state
+
+        mask = features["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return torch.nn.functional.normalize(pooled.float(), dim=-1)
+
+
+def _supports_mean_pool_fusion(model: SentenceTransformer) -> bool:
+    """Transformer + Pooling(mean) [+ Normalize] - саме те, що робить _MeanPoolEncoder"""
+    modules = list(model)
+    if len(modules) < 2 or not isinstance(modules[1], Pooling):
+        return False
+    if modules[1].get_pooling_mode_str() != "mean":
+        return False
+    return all(isinstance(m, Normalize) for m in modules[2:])
+
 
 class IEmbedder(ABC):
     """Базовий інтерфейс для embedder'ів"""
@@ -23,99 +84,508 @@ class IEmbedder(ABC):
         """Векторизує множину чанків (оптимізовано)."""
         pass
 
+    def embed_single(self, text: str) -> np.ndarray:
+        """Векторизує один текст (напр. запит) у вектор float32 (dim,)."""
+        chunk = TextChunk(text=text, chunk_id="query", document_id="query")
+        return np.asarray(self.embed(chunk).vector, dtype=np.float32)
 
-class SentenceBERTEmbedder(IEmbedder):
+    def embed_matrix(self, chunks: List[TextChunk]) -> np.ndarray:
+        """
+        Векторизує множину чанків у суцільну матрицю float32 (N, dim).
+        Рядок i відповідає chunks[i].
+        """
+        results = self.embed_batch(chunks)
+        return np.array([r.vector for r in results], dtype=np.float32)
+
+    def embed_many(self, chunks: List[TextChunk]) -> BatchEmbedderResult:
+        """
+        Векторизує множину чанків у BatchEmbedderResult: матриця (N, dim)
+        та списки id, без окремого EmbedderResult на кожен чанк.
+        """
+        return BatchEmbedderResult(
+            vectors=np.ascontiguousarray(self.embed_matrix(chunks), dtype=np.float32),
+            chunk_ids=[chunk.chunk_id for chunk in chunks],
+            document_ids=[chunk.document_id for chunk in chunks],
+        )
+
+
+class CachedEmbedderMixin:
+    """
+    Content-addressed LRU кеш векторів (ключ - blake2b хеш тексту).
+    embed / embed_batch / embed_matrix векторизують лише тексти, яких немає в кеші.
+    Ставиться перед IEmbedder у списку базових класів; клас має реалізувати
+    _embed_matrix_uncached(chunks), _make_result(chunk, vector) та викликати
+    _init_embedding_cache() в __init__.
+    """
+
+    def _init_embedding_cache(self, max_size: int) -> None:
+        """max_size=0 вимикає кеш"""
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_max_size = max_size
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def embed(self, chunk: TextChunk) -> EmbedderResult:
+        return self.embed_batch([chunk])[0]
+
+    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        if not chunks:
+            return []
+        vectors = self.embed_matrix(chunks)
+        return [
+            self._make_result(chunk, vector)
+            for chunk, vector in zip(chunks, vectors)
+        ]
+
+    def embed_matrix(self, chunks: List[TextChunk]) -> np.ndarray:
+        if not self._cache_max_size or not chunks:
+            return self._embed_matrix_uncached(chunks)
+
+        keys = [self._text_key(chunk.text) for chunk in chunks]
+
+        with self._cache_lock:
+            found = {}
+            for key in keys:
+                if key in self._cache and key not in found:
+                    self._cache.move_to_end(key)
+                    found[key] = self._cache[key]
+
+        # Векторизуємо лише відсутні (і кожен унікальний текст - один раз)
+        missing = {}
+        for chunk, key in zip(chunks, keys):
+            if key not in found and key not in missing:
+                missing[key] = chunk
+
+        if missing:
+            computed = self._embed_matrix_uncached(list(missing.values()))
+            with self._cache_lock:
+                for key, vector in zip(missing, computed):
+                    # Копія рядка, щоб кеш не тримав усю матрицю батча
+                    found[key] = self._cache[key] = vector.copy()
+                while len(self._cache) > self._cache_max_size:
+                    self._cache.popitem(last=False)
+
+            logger.debug("Кеш векторів: %s з %s текстів векторизовано",
+                         len(missing), len(chunks))
+
+        return np.stack([found[key] for key in keys])
+
+
+class SentenceBERTEmbedder(CachedEmbedderMixin, IEmbedder):
     """
     Embedder на базі Sentence-BERT.
     Використовує трансформерні моделі для створення якісних семантичних векторів.
+    Вектори L2-нормалізовані (cosine similarity = inner product).
     """
 
     def __init__(self,
                  model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
                  local_model_name: str = "all-MiniLM-L6-v2",
                  device: Optional[str] = None,
-                 batch_size: int = 32):
+                 batch_size: int = 32,
+                 precision: str = "fp32",
+                 compile_model: bool = False,
+                 max_seq_length: Optional[int] = None,
+                 cache_size: int = 10000):
         """
         Args:
             model_name: Назва моделі з HuggingFace
             device: 'cuda', 'cpu' або None (авто)
             batch_size: Розмір батча для batch_encode
+            precision: 'fp32', 'fp16' (ваги в half, лише CUDA) або
+                       'int8' (динамічна квантизація Linear шарів, лише CPU)
+            compile_model: Скомпілювати трансформер через torch.compile
+                           (на CUDA - mode="reduce-overhead", тобто CUDA graphs)
+            max_seq_length: Межа truncation у токенах (None = з конфігурації моделі).
+                            Padding і так до найдовшого тексту в батчі, тож менша
+                            межа скорочує лише довгі чанки
+            cache_size: Розмір LRU кешу векторів за хешем тексту (0 = вимкнено)
         """
+        if precision not in ("fp32", "fp16", "int8"):
+            raise ValueError(
+                f"Unknown precision: {precision}. Available: 'fp32', 'fp16', 'int8'")
 
         self.model_name = model_name
+        self.batch_size = batch_size
+        self._init_embedding_cache(cache_size)
 
         project_root = Path(__file__).resolve().parent.parent.parent
         load_path = project_root / "local_models" / local_model_name
 
         if os.path.exists(load_path):
-            logger.info(f"Знайдено локальну модель: {local_model_name}")
-            self.model = SentenceTransformer(str(load_path), device=device)
+            logger.info("Знайдено локальну модель: %s", local_model_name)
+            source = str(load_path)
         else:
-            logger.info(f"Завантаження SBERT моделі: {model_name}")
-            self.model = SentenceTransformer(self.model_name, device=device)
+            source = model_name
 
-        self.batch_size = batch_size
+        # Модель спільна для всіх embedder'ів з однаковою конфігурацією
+        key = (source, device or "auto", precision, compile_model, max_seq_length)
+        with _MODEL_CACHE_LOCK:
+            cached = _MODEL_CACHE.get(key)
+            if cached is None:
+                cached = self._load_model(source, device, precision, compile_model,
+                                          max_seq_length)
+                _MODEL_CACHE[key] = cached
+            else:
+                logger.info("Використовується завантажена модель: %s", source)
+
+        self.model, self.precision, self._encoder = cached
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
-        logger.info(f"Модель завантажена. Розмірність: {self.embedding_dim}")
 
-    def embed(self, chunk: TextChunk) -> EmbedderResult:
+        logger.info("Модель завантажена. Розмірність: %s", self.embedding_dim)
+
+    @staticmethod
+    def _load_model(
+        source: str, device: Optional[str], precision: str, compile_model: bool,
+        max_seq_length: Optional[int] = None
+    ) -> Tuple[SentenceTransformer, str, Optional[torch.nn.Module]]:
+        """
+        Завантажує та готує модель (precision, eval, compile).
+
+        Returns:
+            Tuple (модель, фактична precision, fused encoder або None)
         """
-        Векторизує один чанк.
-        Для множини чанків використовуйте embed_batch() (швидше).
+        logger.info("Завантаження SBERT моделі: %s", source)
+        model = SentenceTransformer(source, device=device)
+        if max_seq_length is not None:
+            # Не більше, ніж дозволяють позиційні embeddings моделі
+            model.max_seq_length = min(max_seq_length, model.max_seq_length)
+
+        device_type = model.device.type
+        if device_type == "cpu":
+            _configure_cpu_threads()
+
+        if precision == "fp16" and device_type == "cuda":
+            # Ваги в fp16: tensor cores та вдвічі менше трафіку пам'яті
+            model = model.half()
+        elif precision == "int8" and device_type == "cpu":
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif precision != "fp32":
+            logger.warning("Precision '%s' не підтримується на %s, використовується fp32",
+                           precision, device_type)
+            precision = "fp32"
+
+        model.eval()
+
+        mode = "reduce-overhead" if device_type == "cuda" else "default"
+        encoder = None
+        if _supports_mean_pool_fusion(model):
+            encoder = _MeanPoolEncoder(model[0].auto_model).eval()
+            if compile_model:
+                # Компілюється весь граф transformer + pooling + normalize
+                encoder = torch.compile(encoder, mode=mode)
+                logger.info("Fused encoder скомпільовано (torch.compile, mode=%s)", mode)
+        elif compile_model:
+            SentenceBERTEmbedder._compile_transformer(model, mode)
+
+        return model, precision, encoder
+
+    @staticmethod
+    def _compile_transformer(model: SentenceTransformer, mode: str) -> None:
         """
-        vector = self.model.encode(chunk.text,
-                                   convert_to_numpy=True,
-                                   show_progress_bar=False).tolist()
+        Компілює HF-трансформер всередині SentenceTransformer.
+        Компілюється саме внутрішній модуль, бо encode() викликає його forward
+        через pipeline модулів SentenceTransformer.
+        """
+        transformer = model[0]
+        transformer.auto_model = torch.compile(transformer.auto_model, mode=mode)
+        logger.info("Трансформер скомпільовано (torch.compile, mode=%s)", mode)
+
+    def _forward(self, features: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """Forward pass: L2-нормалізовані вектори (batch, dim) float32"""
+        if self._encoder is not None:
+            return self._encoder(features)
 
+        embeddings = self.model(features)["sentence_embedding"]
+        return torch.nn.functional.normalize(embeddings.float(), dim=-1)
+
+    def _make_result(self, chunk: TextChunk, vector: np.ndarray) -> EmbedderResult:
         return EmbedderResult(vector=vector,
                               chunk_id=chunk.chunk_id,
                               document_id=chunk.document_id,
-                              metadata={
-                                  "method": "Sentence-BERT",
-                                  "model": self.model_name,
-                                  "chunk_index": chunk.chunk_index,
-                                  "text_length": len(chunk.text)
-                              })
+                              metadata=EmbedderMeta(
+                                  method="Sentence-BERT",
+                                  model=self.model_name,
+                                  chunk_index=chunk.chunk_index,
+                                  text_length=len(chunk.text)))
 
-    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+    def embed_single(self, text: str) -> np.ndarray:
+        """
+        Швидкий шлях для одного тексту (запиту): токенізація без padding
+        та прямий forward pass моделі, минаючи batching-логіку encode().
+        """
+        features = self.model.tokenize([text])
+        features = batch_to_device(features, self.model.device)
+
+        with torch.inference_mode():
+            vector = self._forward(features)[0]
+
+        return vector.cpu().numpy()
+
+    def _encode_texts_pipelined(self, texts: List[str]) -> np.ndarray:
+        """
+        Наступні батчі токенізуються в окремому потоці, поки модель обчислює
+        поточний (токенізація не чекає на forward pass і навпаки).
+        Потік токенізації один: HF fast tokenizer не можна викликати конкурентно
+        ("Already borrowed"); наперед готується не більше _TOKENIZE_PREFETCH батчів.
+        Тексти сортуються за довжиною, щоб мінімізувати padding.
+        """
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        batches = iter([[texts[i] for i in order[start:start + self.batch_size]]
+                        for start in range(0, len(texts), self.batch_size)])
+
+        outputs = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = deque(
+                executor.submit(self.model.tokenize, batch)
+                for _, batch in zip(range(_TOKENIZE_PREFETCH), batches))
+            while pending:
+                features = pending.popleft().result()
+                # Звільнене місце - одразу під наступний батч
+                next_batch = next(batches, None)
+                if next_batch is not None:
+                    pending.append(executor.submit(self.model.tokenize, next_batch))
+
+                features = batch_to_device(features, self.model.device)
+                with torch.inference_mode():
+                    embeddings = self._forward(features)
+                outputs.append(embeddings.cpu().numpy())
+
+        vectors = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        vectors[order] = np.concatenate(outputs)
+        return vectors
+
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Batch векторизація текстів (швидше в 5-10 разів ніж по одному)"""
+        # Кілька батчів (fused encoder або CPU): токенізація перекривається з forward
+        if len(texts) > self.batch_size and (self._encoder is not None
+                                             or self.model.device.type == "cpu"):
+            return self._encode_texts_pipelined(texts)
+
+        if self._encoder is not None:
+            # Один батч: перекривати нічого, потік токенізації лише додав би накладні
+            features = batch_to_device(self.model.tokenize(texts), self.model.device)
+            with torch.inference_mode():
+                return self._encoder(features).cpu().numpy()
+
+        with torch.inference_mode():
+            vectors = self.model.encode(texts,
+                                        batch_size=self.batch_size,
+                                        convert_to_numpy=True,
+                                        normalize_embeddings=True,
+                                        show_progress_bar=len(texts) > 50)
+
+        # fp16 модель повертає float16
+        return vectors.astype(np.float32, copy=False)
+
+    def _embed_matrix_uncached(self, chunks: List[TextChunk]) -> np.ndarray:
         """
-        Векторизує множину чанків за один прохід.
-        Використовує batch encoding для оптимізації.
+        Векторизує множину чанків одразу в матрицю float32 (N, dim),
+        без створення EmbedderResult на кожен чанк.
         """
         if not chunks:
-            return []
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
 
         logger.info(
-            f"Векторизація {len(chunks)} чанків (batch_size={self.batch_size})"
+            "Векторизація %s чанків у матрицю (batch_size=%s)",
+            len(chunks),
+            self.batch_size,
         )
+        vectors = self._encode_texts([chunk.text for chunk in chunks])
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+class SentenceBERTOnnxEmbedder(CachedEmbedderMixin, IEmbedder):
+    """
+    Sentence-BERT через ONNX Runtime (optimum): експортований граф з fused
+    операторами, опційно з динамічною int8 квантизацією.
+    Вектори L2-нормалізовані (cosine similarity = inner product).
+    """
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 local_model_name: str = "all-MiniLM-L6-v2",
+                 batch_size: int = 32,
+                 max_seq_length: int = 256,
+                 quantize: bool = False,
+                 cache_size: int = 10000):
+        """
+        Args:
+            model_name: Назва моделі з HuggingFace
+            local_model_name: Назва локальної моделі в local_models/
+            batch_size: Розмір батча
+            max_seq_length: Максимальна довжина послідовності (токени)
+            quantize: Динамічна int8 квантизація (ORTQuantizer)
+            cache_size: Розмір LRU кешу векторів за хешем тексту (0 = вимкнено)
+        """
+        # optimum - опційна залежність, потрібна лише для цього embedder'а
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_seq_length = max_seq_length
+        self._init_embedding_cache(cache_size)
+
+        models_dir = Path(__file__).resolve().parent.parent.parent / "local_models"
+        onnx_path = models_dir / f"{local_model_name}-onnx{'-int8' if quantize else ''}"
+
+        if onnx_path.exists():
+            logger.info("Знайдено експортовану ONNX модель: %s", onnx_path)
+            file_name = "model_quantized.onnx" if quantize else "model.onnx"
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                onnx_path, file_name=file_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(onnx_path)
+        else:
+            source = models_dir / local_model_name
+            source = str(source) if source.exists() else model_name
+            self.model, self.tokenizer = self._export_model(source, onnx_path, quantize)
+
+        self.embedding_dim = self.model.config.hidden_size
+        logger.info("ONNX модель завантажена. Розмірність: %s, int8: %s",
+                    self.embedding_dim, quantize)
+
+    @staticmethod
+    def _export_model(source: str, onnx_path: Path, quantize: bool):
+        """Експорт у ONNX (та int8 квантизація) один раз; результат зберігається в onnx_path"""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        logger.info("Експорт SBERT моделі в ONNX: %s", source)
+        model = ORTModelForFeatureExtraction.from_pretrained(source, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(source)
+
+        if quantize:
+            quantizer = ORTQuantizer.from_pretrained(model)
+            config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=onnx_path, quantization_config=config)
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                onnx_path, file_name="model_quantized.onnx")
+        else:
+            model.save_pretrained(onnx_path)
+
+        tokenizer.save_pretrained(onnx_path)
+        return model, tokenizer
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Forward pass + mean pooling + L2 normalize (float32 (batch, dim))"""
+        features = self.tokenizer(texts,
+                                  padding=True,
+                                  truncation=True,
+                                  max_length=self.max_seq_length,
+                                  return_tensors="np")
+        hidden = self.model(**features).last_hidden_state
+
+        mask = features["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32, copy=False)
+
+    def _make_result(self, chunk: TextChunk, vector: np.ndarray) -> EmbedderResult:
+        return EmbedderResult(vector=vector,
+                              chunk_id=chunk.chunk_id,
+                              document_id=chunk.document_id,
+                              metadata=EmbedderMeta(
+                                  method="Sentence-BERT-ONNX",
+                                  model=self.model_name,
+                                  chunk_index=chunk.chunk_index,
+                                  text_length=len(chunk.text)))
+
+    def embed_single(self, text: str) -> np.ndarray:
+        return self._encode_batch([text])[0]
+
+    def _embed_matrix_uncached(self, chunks: List[TextChunk]) -> np.ndarray:
+        """
+        Векторизує множину чанків у матрицю float32 (N, dim).
+        Тексти сортуються за довжиною, padding - в межах батча.
+        """
+        if not chunks:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+
+        logger.info("Векторизація %s чанків через ONNX Runtime (batch_size=%s)",
+                    len(chunks), self.batch_size)
 
-        # Витягуємо тексти
         texts = [chunk.text for chunk in chunks]
+        order = np.argsort([-len(text) for text in texts], kind="stable")
 
-        # Batch векторизація (швидше в 5-10 разів)
-        vectors = self.model.encode(texts,
-                                    batch_size=self.batch_size,
-                                    convert_to_numpy=True,
-                                    show_progress_bar=len(chunks) > 50)
-
-        # Створюємо результати
-        results = []
-        for chunk, vector in zip(chunks, vectors):
-            results.append(
-                EmbedderResult(vector=vector.tolist(),
-                               chunk_id=chunk.chunk_id,
-                               document_id=chunk.document_id,
-                               metadata={
-                                   "method": "Sentence-BERT",
-                                   "model": self.model_name,
-                                   "chunk_index": chunk.chunk_index,
-                                   "text_length": len(chunk.text)
-                               }))
+        vectors = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            vectors[idx] = self._encode_batch([texts[i] for i in idx])
+        return vectors
 
-        logger.info(
-            f"Векторизація завершена. Розмірність: {len(results[0].vector)}")
-        return results
+class OllamaEmbedder(CachedEmbedderMixin, IEmbedder):
+    """
+    Embedder на базі Ollama (endpoint /api/embed).
+    Батч текстів відправляється одним HTTP запитом; з'єднання перевикористовується
+    через requests.Session.
+    """
+
+    def __init__(self,
+                 model_name: str = "nomic-embed-text",
+                 base_url: str = "http://localhost:11434",
+                 batch_size: int = 32,
+                 timeout: int = 60,
+                 cache_size: int = 10000):
+        """
+        Args:
+            model_name: Назва embedding моделі в Ollama
+            base_url: Адреса Ollama сервера
+            batch_size: Кількість текстів в одному HTTP запиті
+            timeout: Таймаут запиту (секунди)
+            cache_size: Розмір LRU кешу векторів за хешем тексту (0 = вимкнено)
+        """
+        self.model_name = model_name
+        self._init_embedding_cache(cache_size)
+        self.api_url = f"{base_url.rstrip('/')}/api/embed"
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        logger.info("OllamaEmbedder ініціалізовано. Модель: %s", model_name)
 
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Векторизує тексти батчами по batch_size (один запит на батч)"""
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.session.post(
+                self.api_url,
+                json={
+                    "model": self.model_name,
+                    "input": texts[start:start + self.batch_size]
+                },
+                timeout=self.timeout)
+            response.raise_for_status()
+            batches.append(
+                np.asarray(response.json()["embeddings"], dtype=np.float32))
+
+        return np.vstack(batches)
+
+    def _make_result(self, chunk: TextChunk, vector: np.ndarray) -> EmbedderResult:
+        return EmbedderResult(vector=vector,
+                              chunk_id=chunk.chunk_id,
+                              document_id=chunk.document_id,
+                              metadata=EmbedderMeta(
+                                  method="Ollama",
+                                  model=self.model_name,
+                                  chunk_index=chunk.chunk_index,
+                                  text_length=len(chunk.text)))
+
+    def embed_single(self, text: str) -> np.ndarray:
+        return self._embed_texts([text])[0]
+
+    def _embed_matrix_uncached(self, chunks: List[TextChunk]) -> np.ndarray:
+        """Векторизує множину чанків (batch_size текстів на HTTP запит)."""
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32)
+
+        logger.info("Векторизація %s чанків через Ollama (batch_size=%s)",
+                    len(chunks), self.batch_size)
+        return self._embed_texts([chunk.text for chunk in chunks])
 
 class EmbedderFactory:
     """Фабрика для створення embedder'ів"""
@@ -126,7 +596,7 @@ class EmbedderFactory:
         Створює embedder.
         
         Args:
-            method: Тип embedder'а (наразі лише 'sbert')
+            method: Тип embedder'а ('sbert', 'sbert_onnx', 'ollama')
             **kwargs: Параметри для embedder'а
             
         Returns:
@@ -139,7 +609,34 @@ class EmbedderFactory:
                 "model_name", "sentence-transformers/all-MiniLM-L6-v2"),
                                         device=kwargs.get("device", None),
                                         batch_size=kwargs.get(
-                                            "batch_size", 32))
+                                            "batch_size", 32),
+                                        precision=kwargs.get(
+                                            "precision", "fp32"),
+                                        compile_model=kwargs.get(
+                                            "compile_model", False),
+                                        max_seq_length=kwargs.get(
+                                            "max_seq_length", None),
+                                        cache_size=kwargs.get(
+                                            "cache_size", 10000))
+        elif method == "sbert_onnx":
+            return SentenceBERTOnnxEmbedder(model_name=kwargs.get(
+                "model_name", "sentence-transformers/all-MiniLM-L6-v2"),
+                                            batch_size=kwargs.get(
+                                                "batch_size", 32),
+                                            max_seq_length=kwargs.get(
+                                                "max_seq_length", 256),
+                                            quantize=kwargs.get(
+                                                "quantize", False),
+                                            cache_size=kwargs.get(
+                                                "cache_size", 10000))
+        elif method == "ollama":
+            return OllamaEmbedder(model_name=kwargs.get("model_name",
+                                                        "nomic-embed-text"),
+                                  base_url=kwargs.get("base_url",
+                                                      "http://localhost:11434"),
+                                  batch_size=kwargs.get("batch_size", 32),
+                                  timeout=kwargs.get("timeout", 60),
+                                  cache_size=kwargs.get("cache_size", 10000))
         else:
             raise ValueError(
-                f"Unknown embedder method: {method}. Available: 'sbert'")
+                f"Unknown embedder method: {method}. Available: 'sbert', 'sbert_onnx', 'ollama'")
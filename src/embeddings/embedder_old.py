@@ -1,9 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+from typing import List, Tuple
 import numpy as np
-from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
-from src.models import ProcessorResult, EmbedderResult, TextChunk
+from src.models import EmbedderResult, TextChunk
+
+try:
+    from numba import njit
+except ImportError:  # numba опційна: без неї Word2Vec усереднює через numpy
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _mean_rows(vectors, idx, out):
+        """out = середнє рядків vectors[idx] (без проміжної матриці gather)"""
+        n = idx.shape[0]
+        d = vectors.shape[1]
+        out[:] = 0.0
+        for i in range(n):
+            row = vectors[idx[i]]
+            for j in range(d):
+                out[j] += row[j]
+        inv = 1.0 / n
+        for j in range(d):
+            out[j] *= inv
 
 # ----- Strategy interface -----
 
@@ -15,8 +39,19 @@ class IEmbedder(ABC):
         """Векторизує ОДИН чанк"""
         pass
 
+    @abstractmethod
+    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        """Векторизує множину чанків (батчем, а не N викликами embed)"""
+        pass
+
+
+class _SingletonBatchMixin:
+    """
+    embed_batch через N викликів embed - лише для стратегій, які не мають
+    батчевого шляху. Ставиться перед IEmbedder у списку базових класів.
+    """
+
     def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
-        """Векторизує множину чанків"""
         return [self.embed(chunk) for chunk in chunks]
 
 
@@ -25,25 +60,68 @@ class IEmbedder(ABC):
 
 class BOWEmbedder(IEmbedder):
 
+    # Інтернований рядок методу: один об'єкт на всі результати
+    _method = sys.intern("BOW")
+
     def __init__(self, vocabulary: List[str]):
         self.vocab = vocabulary
+        self.dim = len(vocabulary)
+        # Відсортований словник + перестановка в початкові індекси (будується один раз)
+        self.sorted_to_orig = np.argsort(np.asarray(vocabulary), kind="stable")
+        self.sorted_vocab = np.asarray(vocabulary)[self.sorted_to_orig]
+
+    def _token_counts(self, chunk: TextChunk) -> Tuple[np.ndarray, np.ndarray]:
+        """(індекси слів словника, їх частоти) для чанка"""
+        tokens = chunk.text.split()
+        if not tokens or not self.dim:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # Унікальні токени та частоти (сортування в C), пошук у словнику - searchsorted
+        unique, counts = np.unique(np.asarray(tokens), return_counts=True)
+        pos = np.searchsorted(self.sorted_vocab, unique)
+        valid = self.sorted_vocab[pos.clip(max=self.dim - 1)] == unique
+        return self.sorted_to_orig[pos[valid]], counts[valid]
 
-    def embed(self, result: ProcessorResult) -> EmbedderResult:
-        # Використовуємо токени з моделі або розбиваємо текст самі
-        tokens = result.tokens if result.tokens else result.processed_text.split()
-
-        counter = Counter(tokens)
-        vector = [counter.get(word, 0) for word in self.vocab]
+    def embed(self, text_chunk: TextChunk) -> EmbedderResult:
+        ids, counts = self._token_counts(text_chunk)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        vector[ids] = counts
         return EmbedderResult(
-            vector=vector, metadata={"method": "BOW", "dim": len(vector)}
+            vector=vector,
+            chunk_id=text_chunk.chunk_id,
+            document_id=text_chunk.document_id,
+            metadata={"method": self._method},
         )
 
+    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        # Одна матриця на весь батч: рядок row заповнюється частотами чанка
+        matrix = np.zeros((len(chunks), self.dim), dtype=np.float32)
+        for row, chunk in enumerate(chunks):
+            ids, counts = self._token_counts(chunk)
+            matrix[row, ids] = counts
+        return [
+            EmbedderResult(
+                vector=vector,
+                chunk_id=chunk.chunk_id,
+                document_id=chunk.document_id,
+                metadata={"method": self._method},
+            )
+            for vector, chunk in zip(matrix, chunks)
+        ]
+
 
 class TFIDFEmbedder(IEmbedder):
 
-    def __init__(self, documents: List[str]):
+    _method = sys.intern("TF-IDF")
+
+    def __init__(self, documents: List[str], dense: bool = False):
+        # dense=True - лише якщо споживач не працює зі sparse (напр. FAISS)
+        self.dense = dense
+
         # У реальному RAG це проблематично, бо TF-IDF треба тренувати на всьому корпусі заздалегідь.
         # Але для навчального проєкту ок.
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
         self.vectorizer = TfidfVectorizer()
         if documents:
             self.vectorizer.fit(documents)
@@ -51,66 +129,237 @@ class TFIDFEmbedder(IEmbedder):
             # Fallback щоб не падало, якщо документів 0
             self.vectorizer.fit(["dummy text"])
 
-    def embed(self, result: ProcessorResult) -> EmbedderResult:
-        text = result.processed_text
-        vector = self.vectorizer.transform([text]).toarray()[0].tolist()
+        self.dim = len(self.vectorizer.vocabulary_)
+
+    def _make_result(self, vector, chunk: TextChunk) -> EmbedderResult:
+        # dim явно: len() для sparse рядка не визначений
         return EmbedderResult(
-            vector=vector, metadata={"method": "TF-IDF", "dim": len(vector)}
+            vector=vector,
+            chunk_id=chunk.chunk_id,
+            document_id=chunk.document_id,
+            metadata={"method": self._method, "dim": self.dim},
+        )
+
+    def embed(self, text_chunk: TextChunk) -> EmbedderResult:
+        # Рядок CSR (1 x |vocab|) без densify; toarray() - лише там, де потрібен dense
+        vector = self.vectorizer.transform([text_chunk.text])
+        if self.dense:
+            vector = vector.toarray().ravel().astype(np.float32, copy=False)
+        return self._make_result(vector, text_chunk)
+
+    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        # Один виклик transform на весь батч замість N окремих
+        matrix = self.vectorizer.transform([c.text for c in chunks])
+        if self.dense:
+            # Densify один раз на весь батч; рядки - view на спільну матрицю
+            dense = matrix.toarray().astype(np.float32, copy=False)
+            return [self._make_result(row, c) for row, c in zip(dense, chunks)]
+        return [self._make_result(matrix[i], c) for i, c in enumerate(chunks)]
+
+
+class HashingEmbedder(IEmbedder):
+
+    _method = sys.intern("Hashing")
+
+    def __init__(self, n_features: int = 2**18, dense: bool = False):
+        # Stateless: фіксована розмірність, без fit по корпусу (можна індексувати потоком)
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, alternate_sign=False, norm="l2"
         )
+        self.dim = n_features
+        self.dense = dense
 
+    def _make_result(self, vector, chunk: TextChunk) -> EmbedderResult:
+        return EmbedderResult(
+            vector=vector,
+            chunk_id=chunk.chunk_id,
+            document_id=chunk.document_id,
+            metadata={"method": self._method, "dim": self.dim},
+        )
 
-class Word2VecEmbedder(IEmbedder):
+    def embed(self, text_chunk: TextChunk) -> EmbedderResult:
+        vector = self.vectorizer.transform([text_chunk.text])
+        if self.dense:
+            vector = vector.toarray().ravel().astype(np.float32, copy=False)
+        return self._make_result(vector, text_chunk)
+
+    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        matrix = self.vectorizer.transform([c.text for c in chunks])
+        if self.dense:
+            dense = matrix.toarray().astype(np.float32, copy=False)
+            return [self._make_result(row, c) for row, c in zip(dense, chunks)]
+        return [self._make_result(matrix[i], c) for i, c in enumerate(chunks)]
+
+
+class Word2VecEmbedder(_SingletonBatchMixin, IEmbedder):
+
+    _method = sys.intern("Word2Vec")
 
     def __init__(self, model):
         self.model = model
+        # Суцільна float32 матриця векторів (витягується один раз)
+        self._vectors = np.ascontiguousarray(model.wv.vectors, dtype=np.float32)
 
-    def embed(self, result: ProcessorResult) -> EmbedderResult:
-        tokens = result.tokens if result.tokens else result.processed_text.split()
+    def embed(self, text_chunk: TextChunk) -> EmbedderResult:
+        tokens = text_chunk.text.split()
 
-        vectors = [self.model.wv[word] for word in tokens if word in self.model.wv]
-        if not vectors:
-            avg_vector = [0.0] * self.model.vector_size
-        else:
-            avg_vector = np.mean(vectors, axis=0).tolist()
+        # Індекси токенів у суцільній матриці wv.vectors -> gather + mean
+        key_to_index = self.model.wv.key_to_index
+        idx = [key_to_index[word] for word in tokens if word in key_to_index]
+        avg_vector = np.zeros(self.model.vector_size, dtype=np.float32)
+        if idx and njit is not None:
+            _mean_rows(self._vectors, np.asarray(idx, dtype=np.int64), avg_vector)
+        elif idx:
+            avg_vector = self._vectors[idx].mean(axis=0, dtype=np.float32)
 
         return EmbedderResult(
-            vector=avg_vector, metadata={"method": "Word2Vec", "dim": len(avg_vector)}
+            vector=avg_vector,
+            chunk_id=text_chunk.chunk_id,
+            document_id=text_chunk.document_id,
+            metadata={"method": self._method},
         )
 
 
 class SentenceBERTEmbedder(IEmbedder):
 
+    _method = sys.intern("Sentence-BERT")
+
     def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
         from sentence_transformers import SentenceTransformer
 
         self.model = SentenceTransformer(model_name)
 
-    def embed(self, result: ProcessorResult) -> EmbedderResult:
+    def embed(self, text_chunk: TextChunk) -> EmbedderResult:
         # SBERT працює з чистим текстом
-        text = result.processed_text
-        vector = self.model.encode(text).tolist()
+        vector = self.model.encode(text_chunk.text, convert_to_numpy=True).astype(
+            np.float32, copy=False
+        )
         return EmbedderResult(
-            vector=vector, metadata={"method": "Sentence-BERT", "dim": len(vector)}
+            vector=vector,
+            chunk_id=text_chunk.chunk_id,
+            document_id=text_chunk.document_id,
+            metadata={"method": self._method},
         )
 
+    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        # Один encode на весь батч: модель сама ділить на батчі та сортує за довжиною
+        matrix = self.model.encode(
+            [c.text for c in chunks], convert_to_numpy=True
+        ).astype(np.float32, copy=False)
+        return [
+            EmbedderResult(
+                vector=vector,
+                chunk_id=chunk.chunk_id,
+                document_id=chunk.document_id,
+                metadata={"method": self._method},
+            )
+            for vector, chunk in zip(matrix, chunks)
+        ]
+
 
 class OpenAIEmbedder(IEmbedder):
 
-    def __init__(self, client, model="text-embedding-ada-002"):
+    _method = sys.intern("OpenAI")
+
+    # Текстів в одному запиті та одночасних запитів до API
+    GROUP_SIZE = 1000
+    MAX_CONCURRENCY = 8
+    # Повтори запиту з експоненційним backoff (0.5s, 1s, 2s, ...)
+    MAX_RETRIES = 3
+    BACKOFF_SECONDS = 0.5
+
+    def __init__(self, client, model="text-embedding-ada-002", async_client=None):
         self.client = client
         self.model = model
+        # AsyncOpenAI (опційно); без нього sync client викликається в потоках
+        self.async_client = async_client
 
-    def embed(self, result: ProcessorResult) -> EmbedderResult:
-        text = result.processed_text
-        # Замінюємо переноси рядків, це рекомендація OpenAI
-        text = text.replace("\n", " ")
+    def embed(self, text_chunk: TextChunk) -> EmbedderResult:
+        # Без переносів рядків (рекомендація OpenAI)
+        text = text_chunk.text.replace("\n", " ")
 
         response = self.client.embeddings.create(model=self.model, input=text)
         # OpenAI v1.x повертає об'єкт, а не словник
-        vector = response.data[0].embedding
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
         return EmbedderResult(
-            vector=vector, metadata={"method": "OpenAI", "dim": len(vector)}
+            vector=vector,
+            chunk_id=text_chunk.chunk_id,
+            document_id=text_chunk.document_id,
+            metadata={"method": self._method},
+        )
+
+    @staticmethod
+    def _to_matrix(response) -> np.ndarray:
+        # Порядок векторів - за index з відповіді
+        return np.asarray(
+            [d.embedding for d in sorted(response.data, key=lambda d: d.index)],
+            dtype=np.float32,
+        )
+
+    def _make_results(
+        self, matrices: List[np.ndarray], chunks: List[TextChunk]
+    ) -> List[EmbedderResult]:
+        # Групи йдуть у порядку чанків, тож рядки матриць зіставляються з chunks по черзі
+        vectors = (vector for matrix in matrices for vector in matrix)
+        return [
+            EmbedderResult(
+                vector=vector,
+                chunk_id=chunk.chunk_id,
+                document_id=chunk.document_id,
+                metadata={"method": self._method},
+            )
+            for vector, chunk in zip(vectors, chunks)
+        ]
+
+    def _split_groups(self, chunks: List[TextChunk]) -> List[List[str]]:
+        # Тексти без переносів рядків готуються один раз і спільні для всіх повторів
+        texts = [c.text.replace("\n", " ") for c in chunks]
+        return [
+            texts[i:i + self.GROUP_SIZE] for i in range(0, len(texts), self.GROUP_SIZE)
+        ]
+
+    def _embed_group(self, texts: List[str]) -> np.ndarray:
+        """Sync запит для групи текстів з повторами (exponential backoff)"""
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = self.client.embeddings.create(model=self.model, input=texts)
+                return self._to_matrix(response)
+            except Exception:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                time.sleep(self.BACKOFF_SECONDS * 2 ** attempt)
+
+    async def _aembed_group(self, texts: List[str], semaphore: asyncio.Semaphore):
+        async with semaphore:
+            if self.async_client is None:
+                return await asyncio.to_thread(self._embed_group, texts)
+
+            response = await self.async_client.embeddings.create(
+                model=self.model, input=texts
+            )
+        return self._to_matrix(response)
+
+    async def aembed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        # Список текстів одним запитом на групу, групи - паралельно (asyncio.gather)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        matrices = await asyncio.gather(
+            *(self._aembed_group(group, semaphore) for group in self._split_groups(chunks))
         )
+        # gather зберігає порядок груп
+        return self._make_results(matrices, chunks)
+
+    def embed_batch(self, chunks: List[TextChunk]) -> List[EmbedderResult]:
+        # Sync варіант: групи паралельно в потоках (працює і всередині event loop)
+        if not chunks:
+            return []
+
+        groups = self._split_groups(chunks)
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENCY) as executor:
+            # map зберігає порядок груп
+            matrices = list(executor.map(self._embed_group, groups))
+        return self._make_results(matrices, chunks)
 
 
 # ----- Factory -----
@@ -124,7 +373,11 @@ class EmbedderFactory:
         if method == "bow":
             return BOWEmbedder(kwargs["vocabulary"])
         elif method == "tfidf":
-            return TFIDFEmbedder(kwargs["documents"])
+            return TFIDFEmbedder(kwargs["documents"], kwargs.get("dense", False))
+        elif method == "hashing":
+            return HashingEmbedder(
+                kwargs.get("n_features", 2**18), kwargs.get("dense", False)
+            )
         elif method == "word2vec":
             return Word2VecEmbedder(kwargs["model"])
         elif method == "sbert":
@@ -133,7 +386,9 @@ class EmbedderFactory:
             )
         elif method == "openai":
             return OpenAIEmbedder(
-                kwargs["client"], kwargs.get("model", "text-embedding-ada-002")
+                kwargs["client"],
+                kwargs.get("model", "text-embedding-ada-002"),
+                kwargs.get("async_client"),
             )
         else:
             raise ValueError(f"Unknown embedder method: {method}")
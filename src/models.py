@@ -1,8 +1,34 @@
+from __future__ import annotations
+
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+import hashlib
+import sys
+from typing import Dict, Any, Optional, List, Union
 
+import numpy as np
 
-@dataclass
+
+def _restore_slots_state(obj, state) -> None:
+    """
+    __setstate__ для slots-dataclass: приймає як новий стан (None, {slot: value}),
+    так і dict старих pickle (до slots), напр. metadata збережених FAISS індексів.
+    """
+    if isinstance(state, tuple):
+        dict_state, slots_state = state
+        state = {**(dict_state or {}), **(slots_state or {})}
+    for name, value in state.items():
+        object.__setattr__(obj, name, value)
+
+
+def make_document_id(filename: str) -> str:
+    """
+    document_id документа за ім'ям файлу.
+    Схема (перші 16 hex символів md5) не змінюється: ці id вже збережені в індексах.
+    """
+    return hashlib.md5(filename.encode()).hexdigest()[:16]
+
+
+@dataclass(slots=True)
 class ProcessorResult:
     """
     Результат Preprocessor - весь оброблений документ.
@@ -11,7 +37,7 @@ class ProcessorResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
     original_filename: Optional[str] = None
     processing_info: Dict[str, Any] = field(default_factory=dict)
-    chunks: List['TextChunk'] = field(default_factory=list)
+    chunks: List[TextChunk] = field(default_factory=list)
     document_id: Optional[str] = None
 
     def __post_init__(self):
@@ -22,12 +48,13 @@ class ProcessorResult:
             }
         # Генеруємо document_id якщо не вказано
         if not self.document_id and self.original_filename:
-            import hashlib
-            self.document_id = hashlib.md5(
-                self.original_filename.encode()).hexdigest()[:16]
+            self.document_id = make_document_id(self.original_filename)
 
+    def __setstate__(self, state):
+        _restore_slots_state(self, state)
 
-@dataclass
+
+@dataclass(slots=True)
 class TextChunk:
     text: str
     chunk_id: str
@@ -46,21 +73,77 @@ class TextChunk:
         if 'end_char' not in self.metadata:
             self.metadata['end_char'] = self.end_char
 
+    def __setstate__(self, state):
+        _restore_slots_state(self, state)
 
-@dataclass
+
+@dataclass(slots=True)
+class EmbedderMeta:
+    """
+    Метадані векторизації чанка (slots замість dict - менше пам'яті на чанк).
+    method та model інтерновані: один рядок на всі чанки.
+    """
+    method: str
+    model: str
+    chunk_index: int
+    text_length: int
+
+    def __post_init__(self):
+        self.method = sys.intern(self.method)
+        self.model = sys.intern(self.model)
+
+
+@dataclass(slots=True)
 class EmbedderResult:
-    vector: List[float]
+    vector: np.ndarray  # float32 (dim,); у batch - view на рядок спільної матриці
     chunk_id: str
     document_id: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Union[EmbedderMeta, Dict[str, Any]] = field(default_factory=dict)
 
     def __post_init__(self):
-        # Додаємо розмірність вектора
-        if 'dim' not in self.metadata:
+        # Додаємо розмірність вектора (для EmbedderMeta - це vector.shape)
+        if isinstance(self.metadata, dict) and 'dim' not in self.metadata:
             self.metadata['dim'] = len(self.vector)
 
+    @property
+    def vector_bytes(self) -> bytes:
+        """Вектор як суцільні float32 байти (4 B на значення) для збереження"""
+        return np.asarray(self.vector, dtype=np.float32).tobytes()
 
-@dataclass
+    @classmethod
+    def from_bytes(cls, buf: bytes, dim: int, chunk_id: str, document_id: str,
+                   metadata: Union[EmbedderMeta, Dict[str, Any], None] = None
+                   ) -> EmbedderResult:
+        """Відновлює результат з vector_bytes (np.frombuffer - без копії, read-only)"""
+        return cls(vector=np.frombuffer(buf, dtype=np.float32, count=dim),
+                   chunk_id=chunk_id,
+                   document_id=document_id,
+                   metadata=metadata if metadata is not None else {})
+
+
+@dataclass(slots=True)
+class BatchEmbedderResult:
+    """
+    Результат векторизації батча у вигляді SoA: одна суцільна матриця
+    векторів (N, dim) float32 та паралельні списки ідентифікаторів.
+    """
+    vectors: np.ndarray  # float32 (N, dim), рядок i відповідає chunk_ids[i]
+    chunk_ids: List[str]
+    document_ids: List[str]
+    metadata: List[Union[EmbedderMeta, Dict[str, Any]]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def __getitem__(self, i: int) -> EmbedderResult:
+        """EmbedderResult для рядка i (vector - view, без копії)"""
+        return EmbedderResult(vector=self.vectors[i],
+                              chunk_id=self.chunk_ids[i],
+                              document_id=self.document_ids[i],
+                              metadata=self.metadata[i] if self.metadata else {})
+
+
+@dataclass(slots=True)
 class SearchResult:
     """
     Результат пошуку в векторній базі.
@@ -83,6 +166,9 @@ class SearchResult:
         if not self.metadata and self.chunk:
             self.metadata = self.chunk.metadata.copy()
 
+    def __setstate__(self, state):
+        _restore_slots_state(self, state)
+
 
 @dataclass
 class AgentResponse:
@@ -1,23 +1,94 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import os
 import re
-from dataclasses import dataclass
+import sys
+import threading
+from dataclasses import dataclass, replace
 import logging
 
 from src.models import TextChunk
 
 logger = logging.getLogger(__name__)
 
+# (тип chunker'а, config, document_id, хеш тексту) -> chunks.
+# Спільний для всіх екземплярів: Preprocessor створює chunker на кожен документ.
+# Розмір - ChunkingConfig.cache_size (0 = кеш вимкнено)
+_CHUNK_CACHE: "OrderedDict[Tuple, List[TextChunk]]" = OrderedDict()
+_CHUNK_CACHE_LOCK = threading.Lock()
 
-@dataclass
+
+def _trim(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Межі text[start:end] без пробілів по краях (без створення рядка)"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _fixed_windows(
+    text: str, start: int, end: int, chunk_size: int, step: int, min_chunk_size: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    Вікна фіксованого розміру в text[start:end] (абсолютні позиції),
+    що містять не менше min_chunk_size непробільних символів по краях
+    """
+    for window_start in range(start, end, step):
+        window_end = min(window_start + chunk_size, end)
+
+        # strip() лише якщо вікно починається/закінчується пробілом
+        if text[window_start].isspace() or text[window_end - 1].isspace():
+            window_start_trim, window_end_trim = _trim(text, window_start, window_end)
+            content_length = window_end_trim - window_start_trim
+        else:
+            content_length = window_end - window_start
+
+        if content_length >= min_chunk_size:
+            yield window_start, window_end
+
+
+def iter_text_windows(segments: Iterable[str], min_size: int) -> Iterator[str]:
+    """
+    Об'єднує потік сегментів тексту у вікна щонайменше min_size символів,
+    розрізані по останній межі параграфа (або рядка) - обмежений буфер замість
+    повного тексту. Конкатенація вікон дорівнює конкатенації сегментів
+    (кінцевий залишок з одних пробілів відкидається).
+    """
+    buffer = ""
+    for segment in segments:
+        buffer += segment
+        if len(buffer) < min_size:
+            continue
+
+        cut = buffer.rfind("\n\n")
+        if cut <= 0:
+            cut = buffer.rfind("\n")
+        if cut <= 0:
+            continue
+
+        yield buffer[:cut]
+        buffer = buffer[cut:]
+
+    if buffer.strip():
+        yield buffer
+
+
+@dataclass(slots=True, frozen=True)
 class ChunkingConfig:
-    """Конфігурація для chunker"""
+    """Конфігурація для chunker (незмінна, hashable - частина ключа кешу chunks)"""
 
     chunk_size: int = 800  # символів
     chunk_overlap: int = 150  # перекриття між chunks
     min_chunk_size: int = 100  # мінімальний розмір chunk
     respect_sentence_boundaries: bool = True
     respect_paragraph_boundaries: bool = True
+    # LRU кеш chunks (документів); 0 = вимкнено. Має сенс лише при повторному
+    # розбитті тих самих текстів - при одноразовій індексації лише тримає пам'ять
+    cache_size: int = 0
 
     def __post_init__(self):
         if self.chunk_overlap >= self.chunk_size:
@@ -29,23 +100,158 @@ class ChunkingConfig:
 class BaseChunker(ABC):
     """Базовий абстрактний клас для chunkers"""
 
+    # Мінімальний розмір буфера chunk_stream (символів) перед розбиттям
+    STREAM_BUFFER_SIZE = 1 << 20
+
     def __init__(self, config: Optional[ChunkingConfig] = None):
         self.config = config or ChunkingConfig()
 
-    @abstractmethod
     def chunk(self, text: str, document_id: str) -> List[TextChunk]:
         """
-        Розбиває текст на chunks
+        Розбиває текст на chunks. При config.cache_size > 0 результат кешується
+        (LRU): повторний виклик для того ж тексту та конфігурації не розбиває текст заново.
 
         Args:
             text: текст для розбиття
             document_id: ID документа
 
         Returns:
-            List[TextChunk]: список chunks
+            List[TextChunk]: список chunks (копії, їх можна змінювати)
+        """
+        if not self.config.cache_size:
+            return self._chunk(text, document_id)
+
+        key = (
+            type(self).__name__,
+            self.config,
+            document_id,
+            hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(),
+        )
+
+        with _CHUNK_CACHE_LOCK:
+            chunks = _CHUNK_CACHE.get(key)
+            if chunks is not None:
+                _CHUNK_CACHE.move_to_end(key)
+
+        if chunks is None:
+            chunks = self._chunk(text, document_id)
+            with _CHUNK_CACHE_LOCK:
+                _CHUNK_CACHE[key] = chunks
+                while len(_CHUNK_CACHE) > self.config.cache_size:
+                    _CHUNK_CACHE.popitem(last=False)
+        else:
+            logger.info("Chunks для документа %s взято з кешу", document_id)
+
+        return [replace(c, metadata=dict(c.metadata)) for c in chunks]
+
+    def _chunk(self, text: str, document_id: str) -> List[TextChunk]:
+        """Розбиває текст на chunks (без кешу)"""
+        chunks = list(self.iter_chunks(text, document_id))
+        logger.info(
+            "Created %s chunks (%s) for document %s",
+            len(chunks),
+            type(self).__name__,
+            document_id,
+        )
+        return chunks
+
+    @abstractmethod
+    def iter_chunks(self, text: str, document_id: str) -> Iterator[TextChunk]:
+        """
+        Генератор chunks: споживач (напр. embedder) може обробляти перші
+        chunks, поки текст ще розбивається. Без кешу.
+
+        Args:
+            text: текст для розбиття
+            document_id: ID документа
         """
         pass
 
+    def chunk_stream(
+        self, segments: Iterable[str], document_id: str
+    ) -> Iterator[TextChunk]:
+        """
+        Розбиває текст, що надходить сегментами (напр. IDocumentParser.parse_stream),
+        з обмеженим буфером: буфер ріжеться по останній межі параграфа, частина до
+        неї розбивається через iter_chunks, залишок переноситься в наступний сегмент.
+        Overlap між частинами буфера не створюється.
+
+        Args:
+            segments: послідовні сегменти тексту
+            document_id: ID документа
+        """
+        return self.chunk_parts(
+            iter_text_windows(segments, self.STREAM_BUFFER_SIZE), document_id)
+
+    def chunk_parts(
+        self, parts: Iterable[str], document_id: str
+    ) -> Iterator[TextChunk]:
+        """
+        Розбиває послідовні частини одного тексту, кожну окремо (iter_chunks):
+        нумерація chunks наскрізна, позиції - відносно конкатенації частин.
+        Overlap між частинами не створюється.
+
+        Args:
+            parts: послідовні частини тексту
+            document_id: ID документа
+        """
+        offset = 0  # позиція part[0] у повному тексті
+        chunk_index = 0
+
+        for part in parts:
+            for chunk in self.iter_chunks(part, document_id):
+                yield self._shift_chunk(chunk, chunk_index, offset)
+                chunk_index += 1
+            offset += len(part)
+
+    @staticmethod
+    def _shift_chunk(chunk: TextChunk, chunk_index: int, offset: int) -> TextChunk:
+        """Переносить chunk частини буфера в нумерацію та позиції повного тексту"""
+        chunk.chunk_index = chunk_index
+        chunk.chunk_id = f"{chunk.document_id}_chunk_{chunk_index}"
+        chunk.start_char += offset
+        chunk.end_char += offset
+        chunk.metadata["chunk_index"] = chunk_index
+        chunk.metadata["start_char"] = chunk.start_char
+        chunk.metadata["end_char"] = chunk.end_char
+        return chunk
+
+    def _chunk_one(self, document: Tuple[str, str]) -> List[TextChunk]:
+        text, document_id = document
+        return self.chunk(text, document_id)
+
+    def chunk_batch(
+        self,
+        documents: List[Tuple[str, str]],
+        n_workers: Optional[int] = None,
+        chunksize: int = 8,
+        threads: bool = False,
+    ) -> List[List[TextChunk]]:
+        """
+        Розбиває множину документів паралельно
+
+        Args:
+            documents: список (text, document_id)
+            n_workers: кількість воркерів (None = os.cpu_count())
+            chunksize: документів на одне завдання пулу процесів
+            threads: ThreadPoolExecutor замість процесів (без pickle та
+                     запуску процесів; вигідно для невеликих корпусів)
+
+        Returns:
+            List[List[TextChunk]]: chunks кожного документа в порядку documents
+        """
+        n_workers = n_workers or os.cpu_count() or 1
+        if n_workers == 1 or len(documents) <= 1:
+            return [self._chunk_one(document) for document in documents]
+
+        if threads:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                return list(executor.map(self._chunk_one, documents))
+
+        # Процеси обходять GIL для regex та Python циклів; chunker лише з config - pickle дешевий
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(self._chunk_one, documents, chunksize=chunksize))
+
     def _create_chunk(
         self,
         text: str,
@@ -56,6 +262,8 @@ class BaseChunker(ABC):
         metadata: Optional[dict] = None,
     ) -> TextChunk:
         """Допоміжний метод для створення chunk"""
+        # Один об'єкт document_id на всі chunks документа (і після unpickle індексу)
+        document_id = sys.intern(document_id)
         chunk_id = f"{document_id}_chunk_{chunk_index}"
 
         base_metadata = {
@@ -85,34 +293,25 @@ class FixedSizeChunker(BaseChunker):
     Швидкий, але не враховує семантику.
     """
 
-    def chunk(self, text: str, document_id: str) -> List[TextChunk]:
-        chunks = []
-        chunk_index = 0
-        start = 0
-        text_length = len(text)
-
-        while start < text_length:
-            end = min(start + self.config.chunk_size, text_length)
-            chunk_text = text[start:end]
-
-            if len(chunk_text.strip()) >= self.config.min_chunk_size:
-                chunks.append(
-                    self._create_chunk(
-                        text=chunk_text,
-                        chunk_index=chunk_index,
-                        document_id=document_id,
-                        start_char=start,
-                        end_char=end,
-                    )
-                )
-                chunk_index += 1
-
-            start += self.config.chunk_size - self.config.chunk_overlap
-
-        logger.info(
-            f"Created {len(chunks)} fixed-size chunks for document {document_id}"
+    def iter_chunks(self, text: str, document_id: str) -> Iterator[TextChunk]:
+        config = self.config
+        windows = _fixed_windows(
+            text,
+            0,
+            len(text),
+            config.chunk_size,
+            config.chunk_size - config.chunk_overlap,
+            config.min_chunk_size,
         )
-        return chunks
+
+        for chunk_index, (start, end) in enumerate(windows):
+            yield self._create_chunk(
+                text=text[start:end],
+                chunk_index=chunk_index,
+                document_id=document_id,
+                start_char=start,
+                end_char=end,
+            )
 
 
 class SentenceChunker(BaseChunker):
@@ -121,39 +320,66 @@ class SentenceChunker(BaseChunker):
     Оптимальний баланс між швидкістю та якістю.
     """
 
-    # Регулярки для розпізнавання кінця речення
+    # Винятки - скорочення які не є кінцем речення
+    # (нормалізуються один раз: без кінцевих розділових знаків, lowercase)
+    ABBREVIATIONS = frozenset(
+        abbr.rstrip(".!?…").lower()
+        for abbr in (
+            "др",
+            "проф",
+            "акад",
+            "інж",
+            "ст",
+            "мол",
+            "р",  # українські
+            "р.",
+            "ст.",
+            "див.",
+            "напр.",
+            "т.д.",
+            "т.п.",  # з крапками
+            "Mr",
+            "Mrs",
+            "Dr",
+            "Prof",
+            "Inc",
+            "Ltd",
+            "etc",  # англійські
+            "Ph.D",
+            "M.D",
+            "B.A",
+            "M.A",
+        )
+    )
+
+    # Кінець речення одним regex: розділові знаки + пробіли або кінець тексту,
+    # крім випадків, коли перед ними стоїть скорочення (окремий fixed-width
+    # lookbehind на кожне, бо re не підтримує lookbehind змінної довжини).
+    # Pattern починається з класу символів: re швидко пропускає позиції без
+    # розділових знаків, а lookbehind'и (з уже прочитаним знаком, тому "abbr.")
+    # перевіряються лише на кандидатах
     SENTENCE_ENDINGS = re.compile(
-        r"([.!?…]+[\s\n]+)|"  # Стандартні розділові знаки
-        r"([.!?…]+$)"  # Розділові знаки в кінці тексту
+        r"[.!?…](?<![.!?…].)"
+        + "".join(
+            rf"(?<!\b{re.escape(abbr)}.)"
+            for abbr in sorted(ABBREVIATIONS)
+        )
+        + r"[.!?…]*(?:\s+|$)",
+        re.IGNORECASE,
     )
 
-    # Винятки - скорочення які не є кінцем речення
-    ABBREVIATIONS = {
-        "др",
-        "проф",
-        "акад",
-        "інж",
-        "ст",
-        "мол",
-        "р",  # українські
-        "р.",
-        "ст.",
-        "див.",
-        "напр.",
-        "т.д.",
-        "т.п.",  # з крапками
-        "Mr",
-        "Mrs",
-        "Dr",
-        "Prof",
-        "Inc",
-        "Ltd",
-        "etc",  # англійські
-        "Ph.D",
-        "M.D",
-        "B.A",
-        "M.A",
-    }
+    # Те саме для ASCII тексту над bytes (re по bytes помітно швидший);
+    # лише ASCII скорочення, \x1c-\x1f - бо str.isspace() вважає їх пробілами
+    SENTENCE_ENDINGS_ASCII = re.compile(
+        rb"[.!?](?<![.!?].)"
+        + b"".join(
+            rb"(?<!\b" + re.escape(abbr.encode("ascii")) + rb".)"
+            for abbr in sorted(ABBREVIATIONS)
+            if abbr.isascii()
+        )
+        + rb"[.!?]*(?:[\s\x1c-\x1f]+|$)",
+        re.IGNORECASE,
+    )
 
     def _split_into_sentences(self, text: str) -> List[Tuple[str, int, int]]:
         """
@@ -165,160 +391,160 @@ class SentenceChunker(BaseChunker):
         sentences = []
         current_start = 0
 
-        for match in self.SENTENCE_ENDINGS.finditer(text):
-            end_pos = match.end()
-            sentence = text[current_start:end_pos].strip()
+        # Скорочення відсікає сам regex - кожен match є реальним кінцем речення
+        # Позиції обрізаються по пробілах, рядок створюється лише для непорожніх
+        # ASCII: позиції в bytes збігаються з позиціями в str
+        if text.isascii():
+            matches = self.SENTENCE_ENDINGS_ASCII.finditer(text.encode("ascii"))
+        else:
+            matches = self.SENTENCE_ENDINGS.finditer(text)
 
-            # Перевіряємо чи це не скорочення
-            if self._is_real_sentence_end(sentence):
-                if sentence:
-                    sentences.append((sentence, current_start, end_pos))
-                current_start = end_pos
+        for match in matches:
+            start, end = _trim(text, current_start, match.end())
+            if start < end:
+                sentences.append((text[start:end], start, end))
+            current_start = match.end()
 
         # Додаємо залишок тексту якщо є
-        if current_start < len(text):
-            remaining = text[current_start:].strip()
-            if remaining:
-                sentences.append((remaining, current_start, len(text)))
+        start, end = _trim(text, current_start, len(text))
+        if start < end:
+            sentences.append((text[start:end], start, end))
 
         return sentences
 
-    def _is_real_sentence_end(self, sentence: str) -> bool:
-        """Перевіряє чи це справді кінець речення, а не скорочення"""
-        # Проста евристика: перевіряємо останнє слово перед крапкою
-        words = sentence.split()
-        if not words:
-            return True
-
-        last_word = words[-1].rstrip(".!?…")
-        return last_word.lower() not in self.ABBREVIATIONS
+    def iter_chunks(self, text: str, document_id: str) -> Iterator[TextChunk]:
+        return self._iter_chunks(text, document_id)
 
-    def chunk(self, text: str, document_id: str) -> List[TextChunk]:
+    def _iter_chunks(
+        self,
+        text: str,
+        document_id: str,
+        first_index: int = 0,
+        char_offset: int = 0,
+        extra_metadata: Optional[dict] = None,
+    ) -> Iterator[TextChunk]:
+        """
+        iter_chunks для фрагмента більшого документа (напр. параграфа в SemanticChunker):
+        chunks одразу отримують нумерацію з first_index, позиції зсунуті на
+        char_offset, а extra_metadata додається до метаданих кожного chunk
+        """
+        extra_metadata = extra_metadata or {}
         sentences = self._split_into_sentences(text)
-        chunks = []
-        chunk_index = 0
 
-        current_chunk_sentences = []
+        # Короткий текст: усі речення вміщуються в один chunk - без циклу по реченнях
+        if len(text) <= self.config.chunk_size:
+            if sentences and len(text.strip()) >= self.config.min_chunk_size:
+                yield self._create_chunk(
+                    text=text,
+                    chunk_index=first_index,
+                    document_id=document_id,
+                    start_char=char_offset,
+                    end_char=len(text) + char_offset,
+                    metadata={"sentence_count": len(sentences), **extra_metadata},
+                )
+            return
+
+        # Параметри config - у локальних змінних для циклу по реченнях
+        chunk_size = self.config.chunk_size
+        overlap_limit = self.config.chunk_overlap
+        min_chunk_size = self.config.min_chunk_size
+        step = chunk_size - overlap_limit
+        chunk_index = first_index
+
+        # Chunk = зріз text[current_chunk_start:chunk_end]; для overlap потрібні
+        # лише (довжина, start) останніх 3 речень - deque з maxlen
+        sentence_count = 0
+        tail: Deque[Tuple[int, int]] = deque(maxlen=3)
         current_chunk_size = 0
         current_chunk_start = 0
+        chunk_end = 0
 
-        for i, (sentence, start_pos, end_pos) in enumerate(sentences):
+        for sentence, start_pos, end_pos in sentences:
             sentence_length = len(sentence)
 
             # Якщо одне речення більше за chunk_size - розбиваємо його
-            if sentence_length > self.config.chunk_size:
+            if sentence_length > chunk_size:
                 # Зберігаємо попередній chunk якщо є
-                if current_chunk_sentences:
-                    # ✅ Витягуємо тільки текст для об'єднання
-                    chunk_text = " ".join([s[0] for s in current_chunk_sentences])
-                    chunks.append(
-                        self._create_chunk(
-                            text=chunk_text,
-                            chunk_index=chunk_index,
-                            document_id=document_id,
-                            start_char=current_chunk_start,
-                            end_char=start_pos,
-                            metadata={"sentence_count": len(current_chunk_sentences)},
-                        )
+                if sentence_count:
+                    yield self._create_chunk(
+                        text=text[current_chunk_start:start_pos],
+                        chunk_index=chunk_index,
+                        document_id=document_id,
+                        start_char=current_chunk_start + char_offset,
+                        end_char=start_pos + char_offset,
+                        metadata={"sentence_count": sentence_count, **extra_metadata},
                     )
                     chunk_index += 1
-                    current_chunk_sentences = []
+                    sentence_count = 0
+                    tail.clear()
                     current_chunk_size = 0
 
-                # Розбиваємо довге речення як fixed-size
-                for sub_start in range(
-                    0,
-                    sentence_length,
-                    self.config.chunk_size - self.config.chunk_overlap,
+                # Розбиваємо довге речення як fixed-size (sentence == text[start_pos:end_pos])
+                for sub_start, sub_end in _fixed_windows(
+                    text, start_pos, end_pos, chunk_size, step, min_chunk_size
                 ):
-                    sub_end = min(sub_start + self.config.chunk_size, sentence_length)
-                    sub_chunk = sentence[sub_start:sub_end]
-
-                    if len(sub_chunk.strip()) >= self.config.min_chunk_size:
-                        chunks.append(
-                            self._create_chunk(
-                                text=sub_chunk,
-                                chunk_index=chunk_index,
-                                document_id=document_id,
-                                start_char=start_pos + sub_start,
-                                end_char=start_pos + sub_end,
-                                metadata={"is_long_sentence": True},
-                            )
-                        )
-                        chunk_index += 1
+                    yield self._create_chunk(
+                        text=text[sub_start:sub_end],
+                        chunk_index=chunk_index,
+                        document_id=document_id,
+                        start_char=sub_start + char_offset,
+                        end_char=sub_end + char_offset,
+                        metadata={"is_long_sentence": True, **extra_metadata},
+                    )
+                    chunk_index += 1
 
                 current_chunk_start = end_pos
                 continue
 
             # Перевіряємо чи додавання речення не перевищить chunk_size
-            if (
-                current_chunk_size + sentence_length > self.config.chunk_size
-                and current_chunk_sentences
-            ):
-
-                # Зберігаємо поточний chunk
-                # ✅ Витягуємо тільки текст
-                chunk_text = " ".join([s[0] for s in current_chunk_sentences])
-                chunk_end = current_chunk_sentences[-1][
-                    2
-                ]  # ✅ Беремо end_pos останнього речення
-
-                chunks.append(
-                    self._create_chunk(
-                        text=chunk_text,
-                        chunk_index=chunk_index,
-                        document_id=document_id,
-                        start_char=current_chunk_start,
-                        end_char=chunk_end,
-                        metadata={"sentence_count": len(current_chunk_sentences)},
-                    )
+            if current_chunk_size + sentence_length > chunk_size and sentence_count:
+                # Зберігаємо поточний chunk (до end_pos останнього речення)
+                yield self._create_chunk(
+                    text=text[current_chunk_start:chunk_end],
+                    chunk_index=chunk_index,
+                    document_id=document_id,
+                    start_char=current_chunk_start + char_offset,
+                    end_char=chunk_end + char_offset,
+                    metadata={"sentence_count": sentence_count, **extra_metadata},
                 )
                 chunk_index += 1
 
-                # Створюємо overlap - беремо останні речення з попереднього chunk
-                overlap_sentences = []
+                # Створюємо overlap - останні речення попереднього chunk,
+                # поки їх сумарна довжина вміщується в chunk_overlap
+                kept = 0
                 overlap_size = 0
-                overlap_start = current_chunk_start
-
-                for prev_sent, prev_start, prev_end in reversed(
-                    current_chunk_sentences[-3:]
-                ):
-                    if overlap_size + len(prev_sent) <= self.config.chunk_overlap:
-                        overlap_sentences.insert(0, (prev_sent, prev_start, prev_end))
-                        overlap_size += len(prev_sent)
-                        overlap_start = prev_start
-                    else:
+                overlap_start = start_pos
+                for prev_length, prev_start in reversed(tail):
+                    if overlap_size + prev_length > overlap_limit:
                         break
+                    overlap_size += prev_length
+                    overlap_start = prev_start
+                    kept += 1
 
-                current_chunk_sentences = overlap_sentences
+                while len(tail) > kept:
+                    tail.popleft()
+                sentence_count = kept
                 current_chunk_size = overlap_size
-                current_chunk_start = overlap_start if overlap_sentences else start_pos
+                current_chunk_start = overlap_start
 
-            # Додаємо кортеж
-            current_chunk_sentences.append((sentence, start_pos, end_pos))
+            tail.append((sentence_length, start_pos))
+            sentence_count += 1
             current_chunk_size += sentence_length
+            chunk_end = end_pos
 
         # Додаємо останній chunk
-        if current_chunk_sentences:
-            # Витягуємо тільки текст
-            chunk_text = " ".join([s[0] for s in current_chunk_sentences])
-            if len(chunk_text.strip()) >= self.config.min_chunk_size:
-                chunks.append(
-                    self._create_chunk(
-                        text=chunk_text,
-                        chunk_index=chunk_index,
-                        document_id=document_id,
-                        start_char=current_chunk_start,
-                        end_char=len(text),
-                        metadata={"sentence_count": len(current_chunk_sentences)},
-                    )
+        if sentence_count:
+            chunk_text = text[current_chunk_start:]
+            if len(chunk_text.strip()) >= min_chunk_size:
+                yield self._create_chunk(
+                    text=chunk_text,
+                    chunk_index=chunk_index,
+                    document_id=document_id,
+                    start_char=current_chunk_start + char_offset,
+                    end_char=len(text) + char_offset,
+                    metadata={"sentence_count": sentence_count, **extra_metadata},
                 )
 
-        logger.info(
-            f"Created {len(chunks)} sentence-aware chunks for document {document_id}"
-        )
-        return chunks
-
 
 class SemanticChunker(BaseChunker):
     """
@@ -329,46 +555,73 @@ class SemanticChunker(BaseChunker):
     # Розділові знаки для параграфів
     PARAGRAPH_SEPARATOR = re.compile(r"\n\s*\n+")
 
-    # Маркери секцій (заголовки)
+    # Маркери секцій (заголовки); прив'язка до початку параграфа - через match().
+    # Альтернативи взаємовиключні за першими символами, тому порядок - за частотою
     SECTION_MARKERS = re.compile(
-        r"^(#{1,6}\s+.+|"  # Markdown headers
-        r"\d+\.\s+[А-ЯІЇЄҐA-Z].+|"  # Нумеровані заголовки
+        r"(?:\d+\.\s+[А-ЯІЇЄҐA-Z][^\n]+|"  # Нумеровані заголовки
         r"[А-ЯІЇЄҐA-Z][А-ЯІЇЄҐA-Z\s]{3,}|"  # ВЕЛИКІ БУКВИ заголовки
+        r"#{1,6}\s+[^\n]+|"  # Markdown headers
         r"Розділ\s+\d+|"  # "Розділ 1"
         r"Chapter\s+\d+|"  # "Chapter 1"
         r"Глава\s+\d+)",  # "Глава 1"
-        re.MULTILINE,
     )
 
-    def _split_into_paragraphs(self, text: str) -> List[Tuple[str, int, int]]:
-        """Розбиває текст на параграфи"""
+    def __init__(self, config: Optional[ChunkingConfig] = None):
+        super().__init__(config)
+        # Fallback для довгих параграфів - один екземпляр на chunker
+        self._sentence_fallback = SentenceChunker(self.config)
+        self._section_marker_match = self.SECTION_MARKERS.match
+
+    def _scan(self, text: str) -> List[Tuple[str, int, int, Optional[str]]]:
+        """
+        Розбиває текст на параграфи та одразу визначає заголовки секцій
+
+        Returns:
+            List[(paragraph, start_pos, end_pos, section_title або None)]
+        """
         paragraphs = []
+        bounds = []
         last_end = 0
 
         for match in self.PARAGRAPH_SEPARATOR.finditer(text):
-            para_text = text[last_end : match.start()].strip()
-            if para_text:
-                paragraphs.append((para_text, last_end, match.start()))
+            bounds.append(_trim(text, last_end, match.start()))
             last_end = match.end()
-
         # Останній параграф
-        if last_end < len(text):
-            para_text = text[last_end:].strip()
-            if para_text:
-                paragraphs.append((para_text, last_end, len(text)))
+        bounds.append(_trim(text, last_end, len(text)))
+
+        for start, end in bounds:
+            if start >= end:
+                continue
+            # Заголовок шукається в оригінальному тексті в межах параграфа (pos/endpos),
+            # без окремого рядка на параграф
+            match = self._section_marker_match(text, start, end)
+            section_title = match.group(0).strip("#").strip() if match else None
+            paragraphs.append((text[start:end], start, end, section_title))
 
         return paragraphs
 
-    def _extract_section_title(self, text: str) -> Optional[str]:
-        """Витягує заголовок секції якщо є"""
-        match = self.SECTION_MARKERS.match(text)
-        if match:
-            return match.group(0).strip("#").strip()
-        return None
+    def iter_chunks(self, text: str, document_id: str) -> Iterator[TextChunk]:
+        paragraphs = self._scan(text)
+
+        # Короткий текст: усі параграфи вміщуються в один chunk
+        if len(text) <= self.config.chunk_size:
+            if paragraphs:
+                chunk_text = "\n\n".join(p[0] for p in paragraphs)
+                sections = [p[3] for p in paragraphs if p[3]]
+                if len(chunk_text) >= self.config.min_chunk_size:
+                    yield self._create_chunk(
+                        text=chunk_text,
+                        chunk_index=0,
+                        document_id=document_id,
+                        start_char=0,
+                        end_char=len(text),
+                        metadata={
+                            "paragraph_count": len(paragraphs),
+                            "section": sections[-1] if sections else None,
+                        },
+                    )
+            return
 
-    def chunk(self, text: str, document_id: str) -> List[TextChunk]:
-        paragraphs = self._split_into_paragraphs(text)
-        chunks = []
         chunk_index = 0
 
         current_chunk_paras = []
@@ -376,9 +629,8 @@ class SemanticChunker(BaseChunker):
         current_chunk_start = 0
         current_section = None
 
-        for i, (para, start_pos, end_pos) in enumerate(paragraphs):
-            # Перевіряємо чи це заголовок секції
-            section_title = self._extract_section_title(para)
+        for i, (para, start_pos, end_pos, section_title) in enumerate(paragraphs):
+            # Параграф є заголовком секції
             if section_title:
                 current_section = section_title
 
@@ -389,38 +641,34 @@ class SemanticChunker(BaseChunker):
                 # Зберігаємо попередній chunk
                 if current_chunk_paras:
                     chunk_text = "\n\n".join(current_chunk_paras)
-                    chunks.append(
-                        self._create_chunk(
-                            text=chunk_text,
-                            chunk_index=chunk_index,
-                            document_id=document_id,
-                            start_char=current_chunk_start,
-                            end_char=start_pos,
-                            metadata={
-                                "paragraph_count": len(current_chunk_paras),
-                                "section": current_section,
-                            },
-                        )
+                    yield self._create_chunk(
+                        text=chunk_text,
+                        chunk_index=chunk_index,
+                        document_id=document_id,
+                        start_char=current_chunk_start,
+                        end_char=start_pos,
+                        metadata={
+                            "paragraph_count": len(current_chunk_paras),
+                            "section": current_section,
+                        },
                     )
                     chunk_index += 1
                     current_chunk_paras = []
                     current_chunk_size = 0
 
                 # Розбиваємо великий параграф через SentenceChunker
-                sentence_chunker = SentenceChunker(self.config)
-                sub_chunks = sentence_chunker.chunk(para, f"{document_id}_para{i}")
-
-                for sub_chunk in sub_chunks:
-                    # Оновлюємо метадані
-                    sub_chunk.chunk_index = chunk_index
-                    sub_chunk.chunk_id = f"{document_id}_chunk_{chunk_index}"
-                    sub_chunk.document_id = document_id
-                    sub_chunk.metadata["section"] = current_section
-                    sub_chunk.metadata["from_long_paragraph"] = True
-                    sub_chunk.start_char = start_pos + sub_chunk.start_char
-                    sub_chunk.end_char = start_pos + sub_chunk.end_char
-
-                    chunks.append(sub_chunk)
+                # (chunks одразу з нумерацією, позиціями та метаданими документа)
+                for sub_chunk in self._sentence_fallback._iter_chunks(
+                    para,
+                    document_id,
+                    first_index=chunk_index,
+                    char_offset=start_pos,
+                    extra_metadata={
+                        "section": current_section,
+                        "from_long_paragraph": True,
+                    },
+                ):
+                    yield sub_chunk
                     chunk_index += 1
 
                 current_chunk_start = end_pos
@@ -433,18 +681,16 @@ class SemanticChunker(BaseChunker):
             ):
                 # Зберігаємо chunk
                 chunk_text = "\n\n".join(current_chunk_paras)
-                chunks.append(
-                    self._create_chunk(
-                        text=chunk_text,
-                        chunk_index=chunk_index,
-                        document_id=document_id,
-                        start_char=current_chunk_start,
-                        end_char=start_pos,
-                        metadata={
-                            "paragraph_count": len(current_chunk_paras),
-                            "section": current_section,
-                        },
-                    )
+                yield self._create_chunk(
+                    text=chunk_text,
+                    chunk_index=chunk_index,
+                    document_id=document_id,
+                    start_char=current_chunk_start,
+                    end_char=start_pos,
+                    metadata={
+                        "paragraph_count": len(current_chunk_paras),
+                        "section": current_section,
+                    },
                 )
                 chunk_index += 1
 
@@ -473,23 +719,18 @@ class SemanticChunker(BaseChunker):
         if current_chunk_paras:
             chunk_text = "\n\n".join(current_chunk_paras)
             if len(chunk_text.strip()) >= self.config.min_chunk_size:
-                chunks.append(
-                    self._create_chunk(
-                        text=chunk_text,
-                        chunk_index=chunk_index,
-                        document_id=document_id,
-                        start_char=current_chunk_start,
-                        end_char=len(text),
-                        metadata={
-                            "paragraph_count": len(current_chunk_paras),
-                            "section": current_section,
-                        },
-                    )
+                yield self._create_chunk(
+                    text=chunk_text,
+                    chunk_index=chunk_index,
+                    document_id=document_id,
+                    start_char=current_chunk_start,
+                    end_char=len(text),
+                    metadata={
+                        "paragraph_count": len(current_chunk_paras),
+                        "section": current_section,
+                    },
                 )
 
-        logger.info(f"Created {len(chunks)} semantic chunks for document {document_id}")
-        return chunks
-
 
 # Factory для створення chunker
 class ChunkerFactory:
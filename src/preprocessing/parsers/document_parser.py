@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 from pathlib import Path
 
 
 class IDocumentParser(ABC):
     """Базовий інтерфейс для всіх парсерів документів"""
 
+    # True - Preprocessor.process_document читає текст через parse_stream
+    # (вікнами), а не одним parse()
+    streaming: bool = False
+
     @abstractmethod
     def parse(self, file_path: str | Path) -> str:
         """
@@ -19,10 +23,25 @@ class IDocumentParser(ABC):
         """
         pass
 
+    def parse_stream(self, file_path: str | Path) -> Iterator[str]:
+        """
+        Парсить документ частинами (для великих файлів - без повного тексту в пам'яті).
+        За замовчуванням - весь текст одним сегментом; парсери можуть перевизначити.
+
+        Args:
+            file_path: Шлях до файлу
+
+        Yields:
+            Послідовні сегменти тексту
+        """
+        yield self.parse(file_path)
+
+    @classmethod
     @abstractmethod
-    def supports(self, file_path: str | Path) -> bool:
+    def supports(cls, file_path: str | Path) -> bool:
         """
         Перевіряє чи парсер підтримує даний формат.
+        Classmethod: викликається без створення екземпляра парсера.
         
         Args:
             file_path: Шлях до файлу
@@ -32,6 +51,7 @@ class IDocumentParser(ABC):
         """
         pass
 
-    def get_supported_extensions(self) -> List[str]:
+    @classmethod
+    def get_supported_extensions(cls) -> List[str]:
         """Повертає список підтримуваних розширень"""
         return []
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
+import os
+import threading
 from .document_parser import IDocumentParser
+from .parse_cache import cached_parse
 
 logger = logging.getLogger(__name__)
 
+# Спільні PdfConverter між екземплярами парсера (ключ - device):
+# create_model_dict() завантажує кілька ГБ моделей, тож робимо це раз і лише при parse()
+_CONVERTER_CACHE: Dict[str, Any] = {}
+_CONVERTER_CACHE_LOCK = threading.Lock()
+
 
 @dataclass
 class MarkerPdfParserConfig:
@@ -17,6 +26,11 @@ class MarkerPdfParserConfig:
     - max_pages: максимум сторінок для парсингу (None = всі).
     - page_separator: роздільник між сторінками (None щоб не додавати).
     - extract_images: чи витягувати зображення окремо.
+    - image_format: формат збережених зображень ("png" або "jpeg" - швидше кодується).
+    - image_quality: якість JPEG (ігнорується для PNG).
+    - use_cache: повертати збережений текст, якщо файл і config не змінились
+      (<processed_dir>/<хеш>/<processed_text_filename>). Вимкнено за замовчуванням:
+      при попаданні в кеш marker не запускається і зображення не зберігаються.
     """
     max_pages: Optional[int] = None
     page_separator: Optional[str] = None
@@ -25,6 +39,9 @@ class MarkerPdfParserConfig:
     processed_dir: str = "data/processed"
     images_subdir: str = "images"
     processed_text_filename: str = "processed.txt"
+    image_format: str = "png"
+    image_quality: int = 90
+    use_cache: bool = False
 
 
 class MarkerPDFParser(IDocumentParser):
@@ -48,14 +65,28 @@ class MarkerPDFParser(IDocumentParser):
             raise ImportError("Бібліотека 'marker-pdf' не встановлена. "
                               "Встановіть її командою: pip install marker-pdf")
 
-        logger.info("Ініціалізація Marker PDF converter...")
-        try:
-            self.converter = pdf.PdfConverter(
-                artifact_dict=create_model_dict())
-            logger.info("Marker PDF converter успішно ініціалізовано")
-        except Exception as e:
-            logger.error(f"Помилка ініціалізації Marker: {e}")
-            raise
+    @property
+    def converter(self):
+        """PdfConverter створюється при першому зверненні і кешується на рівні модуля"""
+        return self._get_converter(self.config.device)
+
+    @staticmethod
+    def _get_converter(device: str):
+        with _CONVERTER_CACHE_LOCK:
+            converter = _CONVERTER_CACHE.get(device)
+            if converter is None:
+                logger.info("Ініціалізація Marker PDF converter (device=%s)...",
+                            device)
+                try:
+                    artifact_dict = (create_model_dict() if device == "auto"
+                                     else create_model_dict(device=device))
+                    converter = pdf.PdfConverter(artifact_dict=artifact_dict)
+                    logger.info("Marker PDF converter успішно ініціалізовано")
+                except Exception as e:
+                    logger.error("Помилка ініціалізації Marker: %s", e)
+                    raise
+                _CONVERTER_CACHE[device] = converter
+        return converter
 
     def parse(self, file_path: str | Path) -> str:
         path = Path(file_path)
@@ -67,7 +98,14 @@ class MarkerPDFParser(IDocumentParser):
                 f"Unsupported file extension for MarkerPDFParser: {path.suffix}"
             )
 
-        logger.info(f"Початок парсингу PDF з marker-pdf: {path}")
+        if self.config.use_cache:
+            return cached_parse(path, self.config, self.config.processed_dir,
+                                self.config.processed_text_filename,
+                                self._parse_uncached)
+        return self._parse_uncached(path)
+
+    def _parse_uncached(self, path: Path) -> str:
+        logger.info("Початок парсингу PDF з marker-pdf: %s", path)
 
         try:
             # Основна обробка через marker
@@ -82,12 +120,13 @@ class MarkerPDFParser(IDocumentParser):
             processed_text = self._process_text_output(text, images, path)
 
             logger.info(
-                f"PDF парсинг завершено. Отримано {len(processed_text)} символів"
+                "PDF парсинг завершено. Отримано %s символів",
+                len(processed_text),
             )
             return processed_text
 
         except Exception as e:
-            logger.error(f"Помилка парсингу PDF {path}: {e}")
+            logger.error("Помилка парсингу PDF %s: %s", path, e)
             raise
 
     def _process_text_output(self, text: str, images: dict,
@@ -106,15 +145,11 @@ class MarkerPDFParser(IDocumentParser):
         # Додаємо роздільники сторінок (якщо потрібно)
         if self.config.page_separator:
             page_size = 50
-            processed_lines = []
-
-            for i, line in enumerate(text_lines):
-                processed_lines.append(line)
-
-                if (i + 1) % page_size == 0 and i < len(text_lines) - 1:
-                    processed_lines.append(self.config.page_separator)
-
-            text = '\n'.join(processed_lines)
+            pages = [
+                '\n'.join(text_lines[i:i + page_size])
+                for i in range(0, len(text_lines), page_size)
+            ]
+            text = ('\n' + self.config.page_separator + '\n').join(pages)
         else:
             text = '\n'.join(text_lines)
 
@@ -137,7 +172,11 @@ class MarkerPDFParser(IDocumentParser):
             PIL_AVAILABLE = False
 
         logger.info(
-            f"Знайдено {len(images)} зображень. Збереження у папку: {self.config.processed_dir}/{source_path.stem}/{self.config.images_subdir}"
+            "Знайдено %s зображень. Збереження у папку: %s/%s/%s",
+            len(images),
+            self.config.processed_dir,
+            source_path.stem,
+            self.config.images_subdir,
         )
 
         # Папка: <processed_dir>/<file_stem>/<images_subdir>
@@ -145,7 +184,8 @@ class MarkerPDFParser(IDocumentParser):
                           ) / source_path.stem / self.config.images_subdir
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        saved = []
+        image_format = self.config.image_format.lower()
+        ext = "jpg" if image_format in ("jpeg", "jpg") else image_format
 
         # Normalize items: dict->items(), list/iterable->enumerated (string keys)
         if isinstance(images, dict):
@@ -153,54 +193,40 @@ class MarkerPDFParser(IDocumentParser):
         else:
             items = [(str(i), v) for i, v in enumerate(images)]
 
-        for idx, (name, val) in enumerate(items):
-            # Compose a safe filename base
-            try:
-                key_name = str(name)
-            except Exception:
-                key_name = f"img{idx}"
-
-            file_bytes = None
-            ext = None
-
-            safe_name = f"{key_name}_{idx}.png"
-            out_path = output_dir / safe_name
-            try:
-                val.save(out_path)
-                saved.append(str(out_path))
-                logger.debug(f"Збережено (PIL): {out_path}")
-                continue
-            except Exception as e:
-                logger.warning(
-                    f"Не вдалося зберегти PIL image {key_name}: {e}")
-
-            # fallback: try to convert to bytes
-            if file_bytes:
-                # ensure bytes-like
-                if not isinstance(file_bytes, (bytes, bytearray)):
-                    logger.warning(
-                        f"Не вдалося перетворити в bytes зображення '{key_name}' (index {idx}), пропускаємо"
-                    )
-                    continue
-
-                if not ext:
-                    ext = "png"
-
-                safe_name = f"{key_name}_{idx}.{ext}"
-                out_path = output_dir / safe_name
-                try:
-                    with open(out_path, "wb") as fh:
-                        fh.write(file_bytes)
-                    saved.append(str(out_path))
-                    logger.debug(f"Збережено: {out_path}")
-                except Exception as e:
-                    logger.warning(f"Не вдалося записати файл {out_path}: {e}")
+        pairs: List[Tuple[Any, Path]] = [
+            (val, output_dir / f"{name}_{idx}.{ext}")
+            for idx, (name, val) in enumerate(items)
+        ]
+
+        # Кодування PNG/JPEG у PIL відпускає GIL - зберігаємо паралельно
+        max_workers = min(8, os.cpu_count() or 1, len(pairs) or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._save_image, pairs))
+
+        saved = [str(out_path) for ok, (_, out_path) in zip(results, pairs) if ok]
+
+        logger.info("Збережено %s зображень у: %s", len(saved), output_dir)
+
+    def _save_image(self, pair: Tuple[Any, Path]) -> bool:
+        """Зберігає одне PIL зображення; True при успіху"""
+        val, out_path = pair
+        try:
+            if out_path.suffix == ".jpg":
+                # JPEG не підтримує альфа-канал / палітру
+                val = val.convert("RGB")
+                val.save(out_path,
+                         format="JPEG",
+                         quality=self.config.image_quality,
+                         optimize=False)
             else:
-                logger.warning(
-                    f"Не вдалося розпізнати формат зображення '{key_name}' (index {idx}), пропускаємо"
-                )
+                val.save(out_path, format=self.config.image_format.upper())
+        except Exception as e:
+            logger.warning("Не вдалося зберегти зображення %s: %s",
+                           out_path.name, e)
+            return False
 
-        logger.info(f"Збережено {len(saved)} зображень у: {output_dir}")
+        logger.debug("Збережено (PIL): %s", out_path)
+        return True
 
     def get_metadata(self) -> dict:
         """Повертає метадані про парсер"""
@@ -216,13 +242,18 @@ class MarkerPDFParser(IDocumentParser):
                 "device": self.config.device,
                 "processed_dir": self.config.processed_dir,
                 "images_subdir": self.config.images_subdir,
-                "processed_text_filename": self.config.processed_text_filename
+                "processed_text_filename": self.config.processed_text_filename,
+                "image_format": self.config.image_format,
+                "image_quality": self.config.image_quality,
+                "use_cache": self.config.use_cache
             }
         }
 
-    def supports(self, file_path: str | Path) -> bool:
-        """Перевіряє чи це PDF"""
+    @classmethod
+    def supports(cls, file_path: str | Path) -> bool:
+        """Перевіряє чи це PDF (без ініціалізації парсера)"""
         return Path(file_path).suffix.lower() == '.pdf'
 
-    def get_supported_extensions(self) -> List[str]:
+    @classmethod
+    def get_supported_extensions(cls) -> List[str]:
         return ['.pdf']
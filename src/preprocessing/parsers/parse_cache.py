@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable
+
+try:
+    from blake3 import blake3 as _hasher
+except ImportError:  # blake3 опційна: без неї - sha256
+    _hasher = hashlib.sha256
+
+logger = logging.getLogger(__name__)
+
+# Розмір блоку при хешуванні файлу
+HASH_BLOCK_SIZE = 1 << 16
+
+
+def file_digest(path: str | Path) -> str:
+    """Хеш вмісту файлу (читається блоками, без повного завантаження в пам'ять)"""
+    h = _hasher()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cached_parse(
+    path: Path,
+    config: object,
+    cache_dir: str | Path,
+    filename: str,
+    parse_fn: Callable[[Path], str],
+) -> str:
+    """
+    Content-addressed кеш результату парсингу:
+    <cache_dir>/<hash(файл, тип config, repr(config))>/<filename>.
+
+    Args:
+        path: Шлях до документа
+        config: Конфігурація парсера (входить у ключ через repr)
+        cache_dir: Папка кешу
+        filename: Ім'я файлу з текстом
+        parse_fn: Парсинг при промаху кешу
+
+    Returns:
+        Витягнутий текст
+    """
+    config_key = f"{type(config).__qualname__}\0{config!r}"
+    key = hashlib.sha256(
+        f"{file_digest(path)}\0{config_key}".encode("utf-8")).hexdigest()
+    out = Path(cache_dir) / key / filename
+
+    if out.exists():
+        logger.info("Кеш парсингу: %s -> %s", path.name, out)
+        return out.read_text(encoding="utf-8")
+
+    text = parse_fn(path)
+
+    # Атомарний запис: читач ніколи не побачить частково записаний файл
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(out)
+
+    return text
@@ -1,16 +1,48 @@
 # src/preprocessing/parsers/parser_factory.py
 
-from typing import Optional, Dict, Type
+from typing import Any, Optional, Dict, Type
 from pathlib import Path
 import logging
 
+import pdfplumber
+
 from src.preprocessing.parsers.document_parser import IDocumentParser
-from src.preprocessing.parsers.pdf_parser import PDFParser
+from src.preprocessing.parsers.pdf_parser import PDFParser, PdfParserConfig
 from src.preprocessing.parsers.marker_pdf_parser import MarkerPDFParser
 from src.preprocessing.parsers.txt_parser import TXTParser
 
 logger = logging.getLogger(__name__)
 
+# Стратегія PDFParser за кількістю сторінок: перше правило, де
+# кількість сторінок <= up_to_pages (None = без обмеження).
+# config - параметри PdfParserConfig для цього розміру; stream=True -
+# Preprocessor читає документ посторінково (parse_stream), а не цілим parse().
+# pdfplumber - чистий Python: потоки під GIL витяг не прискорюють, тож паралельно
+# (процесами) обробляються лише великі документи, де виграш перекриває старт
+# пулу та повторне відкриття PDF у кожному воркері.
+PDF_SIZE_RULES: Dict[str, Dict[str, Any]] = {
+    "small": {"up_to_pages": 50, "config": {"parallel": False}},
+    "medium": {"up_to_pages": 200, "config": {"parallel": False, "stream": True}},
+    "large": {
+        "up_to_pages": 500,
+        "config": {
+            "parallel": True,
+            "use_processes": True,
+            "batch_size": 25,
+            "stream": True,
+        },
+    },
+    "xlarge": {
+        "up_to_pages": None,
+        "config": {
+            "parallel": True,
+            "use_processes": True,
+            "batch_size": 50,
+            "stream": True,
+        },
+    },
+}
+
 
 class ParserFactory:
     """Фабрика для автоматичного вибору парсера за типом файлу"""
@@ -22,6 +54,9 @@ class ParserFactory:
         'pdf_marker': MarkerPDFParser
     }
 
+    # Індекс розширення -> клас парсера (перший зареєстрований має пріоритет)
+    _by_ext: Dict[str, Type[IDocumentParser]] = {}
+
     @classmethod
     def create(cls, parser_type: str, **kwargs) -> IDocumentParser:
         """
@@ -43,12 +78,18 @@ class ParserFactory:
         return parser_class(**kwargs)
 
     @classmethod
-    def auto_detect(cls, file_path: str | Path) -> IDocumentParser:
+    def _index_extensions(cls, parser_class: Type[IDocumentParser]) -> None:
+        for ext in parser_class.get_supported_extensions():
+            cls._by_ext.setdefault(ext.lower(), parser_class)
+
+    @classmethod
+    def auto_detect(cls, file_path: str | Path, **kwargs) -> IDocumentParser:
         """
         Автоматично визначає парсер за розширенням файлу.
         
         Args:
             filepath: Шлях до файлу
+            **kwargs: Параметри для парсера
             
         Returns:
             Найкращий парсер для цього файлу
@@ -56,16 +97,51 @@ class ParserFactory:
         file_path = Path(file_path)
         extension = file_path.suffix.lower()
 
-        # Перебираємо всі парсери і шукаємо підходящий
-        for parser_name, parser_class in cls._parsers.items():
-            parser = parser_class()
-            if parser.supports(str(file_path)):
-                logger.info(
-                    f"Auto-detected parser '{parser_name}' for {extension}")
-                return parser
+        parser_class = cls._by_ext.get(extension)
+        if parser_class is None:
+            # Парсери з нестандартною supports(): перевірка без створення екземплярів
+            parser_class = next(
+                (p for p in cls._parsers.values() if p.supports(file_path)),
+                None)
 
-        raise ValueError(f"No parser found for file: {file_path}. "
-                         f"Extension: {extension}")
+        if parser_class is None:
+            raise ValueError(f"No parser found for file: {file_path}. "
+                             f"Extension: {extension}")
+
+        logger.info("Auto-detected parser '%s' for %s", parser_class.__name__,
+                    extension)
+        return parser_class(**kwargs)
+
+    @classmethod
+    def auto_detect_by_size(cls, file_path: str | Path) -> IDocumentParser:
+        """
+        Як auto_detect, але для PDF налаштовує PDFParser за кількістю
+        сторінок згідно з PDF_SIZE_RULES (PDF відкривається лише для підрахунку сторінок).
+
+        Args:
+            file_path: Шлях до файлу
+
+        Returns:
+            Парсер, налаштований під розмір документа
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() != ".pdf":
+            return cls.auto_detect(file_path)
+
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        with pdfplumber.open(str(file_path)) as pdf:
+            num_pages = len(pdf.pages)
+
+        for rule_name, rule in PDF_SIZE_RULES.items():
+            up_to_pages = rule["up_to_pages"]
+            if up_to_pages is None or num_pages <= up_to_pages:
+                logger.info("PDF %s: %s сторінок, стратегія '%s'",
+                            file_path.name, num_pages, rule_name)
+                return PDFParser(PdfParserConfig(**rule["config"]))
+
+        return PDFParser()
 
     @classmethod
     def register(cls, name: str, parser_class: Type[IDocumentParser]):
@@ -74,4 +150,9 @@ class ParserFactory:
         Дозволяє додавати custom парсери ззовні.
         """
         cls._parsers[name] = parser_class
-        logger.info(f"Registered custom parser: {name}")
+        cls._index_extensions(parser_class)
+        logger.info("Registered custom parser: %s", name)
+
+
+for _parser_class in ParserFactory._parsers.values():
+    ParserFactory._index_extensions(_parser_class)
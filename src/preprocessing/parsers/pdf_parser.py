@@ -1,11 +1,16 @@
 from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Dict, Iterator, Optional, List, Sequence, Tuple
 
 import pdfplumber
 
 from .document_parser import IDocumentParser
+from .parse_cache import cached_parse
 
 
 @dataclass
@@ -15,10 +20,35 @@ class PdfParserConfig:
     - include_tables: чи витягати таблиці окремо та додавати як текст.
     - page_separator: роздільник між сторінками (None щоб не додавати).
     - max_pages: максимум сторінок для парсингу (None = всі).
+    - parallel: витягувати сторінки паралельно (пакетами по batch_size).
+    - use_processes: ProcessPoolExecutor замість потоків (витяг тексту pdfplumber
+      CPU-bound і тримає GIL: потоки самі по собі не прискорюють).
+    - max_workers: кількість воркерів (None = os.cpu_count()).
+    - batch_size: сторінок на одну задачу воркера.
+    - cache_dir: папка кешу результатів parse() за хешем файлу і config (None = без кешу).
+    - stream: Preprocessor читає документ посторінково через parse_stream
+      замість parse() (для великих PDF; кеш parse() при цьому не використовується).
     """
     include_tables: bool = False
     page_separator: Optional[str] = None
     max_pages: Optional[int] = None
+    parallel: bool = False
+    use_processes: bool = False
+    max_workers: Optional[int] = None
+    batch_size: int = 8
+    cache_dir: Optional[str] = None
+    stream: bool = False
+
+
+def _extract_pages(path: str, indices: Sequence[int],
+                   include_tables: bool) -> List[Tuple[int, str]]:
+    """
+    Витягує текст пакета сторінок. Кожен воркер відкриває PDF сам:
+    об'єкти pdfplumber не потокобезпечні й не серіалізуються між процесами.
+    """
+    with pdfplumber.open(path) as pdf:
+        return [(i, PDFParser._extract_page_text(pdf.pages[i], include_tables))
+                for i in indices]
 
 
 class PDFParser(IDocumentParser):
@@ -30,7 +60,66 @@ class PDFParser(IDocumentParser):
     def __init__(self, config: Optional[PdfParserConfig] = None) -> None:
         self.config = config or PdfParserConfig()
 
+    @property
+    def streaming(self) -> bool:
+        return self.config.stream
+
     def parse(self, file_path: str | Path) -> str:
+        if self.config.cache_dir:
+            return cached_parse(self._validate(file_path), self.config,
+                                self.config.cache_dir, "parsed.txt",
+                                self._parse_uncached)
+        return self._parse_uncached(file_path)
+
+    def _parse_uncached(self, file_path: str | Path) -> str:
+        # Повертаємо сирий текст; подальшу чистку робитимуть воркери
+        return "\n".join(p for p in self._iter_parts(file_path) if p)
+
+    def parse_stream(self, file_path: str | Path) -> Iterator[str]:
+        """Посторінковий потік; конкатенація сегментів відповідає parse()"""
+        for part in self._iter_parts(file_path):
+            if part:
+                yield part + "\n"
+
+    def iter_pages(self, file_path: str | Path) -> Iterator[str]:
+        """
+        Генератор тексту сторінок (з урахуванням max_pages): у пам'яті
+        тримається лише поточна сторінка (або пакет при parallel=True).
+
+        Args:
+            file_path: Шлях до PDF
+
+        Yields:
+            Текст сторінки (може бути порожнім)
+        """
+        path = self._validate(file_path)
+
+        with pdfplumber.open(str(path)) as pdf:
+            num_pages = len(pdf.pages)
+            count = min(num_pages, self.config.max_pages or num_pages)
+
+            if self.config.parallel and count > 1:
+                yield from self._iter_parallel(str(path), count)
+                return
+
+            for i in range(count):
+                yield self._extract_page_text(pdf.pages[i],
+                                              self.config.include_tables)
+
+    def extract_metadata(self, file_path: str | Path) -> Dict[str, Any]:
+        """
+        Метадані PDF (Title, Author, ...) і кількість сторінок
+        без витягу тексту сторінок.
+        """
+        path = self._validate(file_path)
+
+        with pdfplumber.open(str(path)) as pdf:
+            metadata: Dict[str, Any] = dict(pdf.metadata or {})
+            metadata["num_pages"] = len(pdf.pages)
+
+        return metadata
+
+    def _validate(self, file_path: str | Path) -> Path:
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
@@ -39,37 +128,64 @@ class PDFParser(IDocumentParser):
             raise ValueError(
                 f"Unsupported file extension for PDFParser: {path.suffix}")
 
-        parts: List[str] = []
+        return path
 
-        with pdfplumber.open(str(path)) as pdf:
-            num_pages = len(pdf.pages)
-            limit = self.config.max_pages or num_pages
-
-            for i in range(min(num_pages, limit)):
-                page = pdf.pages[i]
-
-                # Основний текст сторінки
-                page_text = page.extract_text(layout=True) or ""
-                # Деякі PDF повертатимуть None — нормалізуємо до порожнього рядка
+    def _iter_parts(self, file_path: str | Path) -> Iterator[str]:
+        """Сторінки, розділені page_separator (якщо задано)"""
+        separator = self.config.page_separator
+        for i, page_text in enumerate(self.iter_pages(file_path)):
+            # Розділювач між сторінками, якщо задано
+            if separator and i > 0:
+                yield separator
+            yield page_text
 
-                # Витяг таблиць як текст
-                if self.config.include_tables:
-                    tables_text = self._extract_tables_as_text(page)
-                    if tables_text:
-                        if page_text and not page_text.endswith("\n"):
-                            page_text += "\n"
-                        page_text += tables_text
+    def _iter_parallel(self, path: str, count: int) -> Iterator[str]:
+        """
+        Паралельний витяг сторінок: пакети індексів роздаються воркерам,
+        результати віддаються в порядку сторінок.
+        "В польоті" не більше 2 * max_workers пакетів: новий пакет подається,
+        лише коли споживач забрав найстаріший (executor.map подав би всі одразу
+        і тримав би в пам'яті текст усіх готових сторінок).
+        """
+        batch_size = max(1, self.config.batch_size)
+        num_batches = -(-count // batch_size)
+        batches = (range(start, min(start + batch_size, count))
+                   for start in range(0, count, batch_size))
+        max_workers = min(self.config.max_workers or os.cpu_count() or 1,
+                          num_batches)
+        executor_cls: type[Executor] = (ProcessPoolExecutor
+                                        if self.config.use_processes else
+                                        ThreadPoolExecutor)
+        include_tables = self.config.include_tables
+
+        with executor_cls(max_workers=max_workers) as executor:
+            pending = deque(
+                executor.submit(_extract_pages, path, batch, include_tables)
+                for _, batch in zip(range(2 * max_workers), batches))
+            while pending:
+                batch_result = pending.popleft().result()
+                next_batch = next(batches, None)
+                if next_batch is not None:
+                    pending.append(executor.submit(_extract_pages, path,
+                                                   next_batch, include_tables))
+                for _, page_text in batch_result:
+                    yield page_text
 
-                # Додаємо в загальний буфер
-                parts.append(page_text.strip())
+    @staticmethod
+    def _extract_page_text(page, include_tables: bool) -> str:
+        """Текст однієї сторінки (з таблицями, якщо потрібно)"""
+        # Деякі PDF повертатимуть None — нормалізуємо до порожнього рядка
+        page_text = page.extract_text(layout=True) or ""
 
-                # Розділювач між сторінками, якщо задано
-                if self.config.page_separator and i < min(num_pages,
-                                                          limit) - 1:
-                    parts.append(self.config.page_separator)
+        # Витяг таблиць як текст
+        if include_tables:
+            tables_text = PDFParser._extract_tables_as_text(page)
+            if tables_text:
+                if page_text and not page_text.endswith("\n"):
+                    page_text += "\n"
+                page_text += tables_text
 
-        # Повертаємо сирий текст; подальшу чистку робитимуть воркери
-        return "\n".join(p for p in parts if p)
+        return page_text.strip()
 
     @staticmethod
     def _extract_tables_as_text(page) -> str:
@@ -101,9 +217,11 @@ class PDFParser(IDocumentParser):
 
         return "\n\n".join(blocks)
 
-    def supports(self, file_path: str | Path) -> bool:
+    @classmethod
+    def supports(cls, file_path: str | Path) -> bool:
         """Перевіряє чи це PDF"""
         return Path(file_path).suffix.lower() == '.pdf'
 
-    def get_supported_extensions(self) -> List[str]:
+    @classmethod
+    def get_supported_extensions(cls) -> List[str]:
         return ['.pdf']
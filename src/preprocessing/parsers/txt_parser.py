@@ -1,7 +1,9 @@
 from src.preprocessing.parsers.document_parser import IDocumentParser
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Tuple
+import codecs
 import logging
+import mmap
 
 logger = logging.getLogger(__name__)
 
@@ -17,19 +19,83 @@ class TXTParser(IDocumentParser):
         self.encoding = encoding
 
     def parse(self, file_path: str | Path) -> str:
-        """Читає текстовий файл"""
+        """Читає текстовий файл (один бінарний read + bytes.decode)"""
+        data = Path(file_path).read_bytes()
         try:
-            with open(file_path, "r", encoding=self.encoding) as f:
-                return f.read()
+            text = data.decode(self.encoding)
         except UnicodeDecodeError:
-            # Спроба з іншим кодуванням
-            logger.warning(f"Помилка з {self.encoding}, спроба cp1251")
-            with open(file_path, "r", encoding="cp1251") as f:
-                return f.read()
+            # Спроба з іншим кодуванням - без повторного читання файлу
+            logger.warning("Помилка з %s, спроба cp1251", self.encoding)
+            text = data.decode("cp1251", errors="replace")
 
-    def supports(self, file_path: str | Path) -> bool:
+        # Як у текстовому режимі open(): \r\n та \r -> \n
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    # Байтів на сегмент parse_stream
+    SEGMENT_SIZE = 1 << 20
+
+    def parse_stream(self, file_path: str | Path) -> Iterator[str]:
+        """
+        Читає текстовий файл сегментами через mmap (сторінки підвантажуються
+        ядром на вимогу, без копії всього файлу в пам'ять процесу).
+        Конкатенація сегментів дорівнює parse(): те саме кодування і ті самі переноси рядків.
+        """
+        with open(file_path, "rb") as f:
+            if Path(file_path).stat().st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from self._normalize_newlines(
+                    self._iter_decoded(mm, *self._detect_encoding(mm)))
+
+    def _detect_encoding(self, mm: mmap.mmap) -> Tuple[str, str]:
+        """
+        (кодування, errors) для всього файлу - до того, як щось віддано споживачу.
+        Перевірочний прохід декодує сегменти без збереження тексту.
+        """
+        try:
+            for _ in self._iter_decoded(mm, self.encoding):
+                pass
+        except UnicodeDecodeError:
+            logger.warning("Помилка з %s, спроба cp1251", self.encoding)
+            return "cp1251", "replace"
+        return self.encoding, "strict"
+
+    def _iter_decoded(self, mm: mmap.mmap, encoding: str,
+                      errors: str = "strict") -> Iterator[str]:
+        # Інкрементальний decoder: багатобайтові символи на межі сегментів не ріжуться
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        for start in range(0, len(mm), self.SEGMENT_SIZE):
+            segment = decoder.decode(mm[start:start + self.SEGMENT_SIZE])
+            if segment:
+                yield segment
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    @staticmethod
+    def _normalize_newlines(segments: Iterator[str]) -> Iterator[str]:
+        """CRLF та CR -> LF, як у parse(); CR в кінці сегмента чекає на наступний"""
+        pending_cr = False
+        for segment in segments:
+            if pending_cr:
+                segment = "\r" + segment
+            pending_cr = segment.endswith("\r")
+            if pending_cr:
+                segment = segment[:-1]
+            if "\r" in segment:
+                segment = segment.replace("\r\n", "\n").replace("\r", "\n")
+            if segment:
+                yield segment
+        if pending_cr:
+            yield "\n"
+
+    @classmethod
+    def supports(cls, file_path: str | Path) -> bool:
         """Підтримує .txt файли"""
         return Path(file_path).suffix.lower() in [".txt", ".text"]
 
-    def get_supported_extensions(self) -> List[str]:
+    @classmethod
+    def get_supported_extensions(cls) -> List[str]:
         return [".txt", ".text"]
@@ -1,13 +1,13 @@
 # src/preprocessing/preprocessor.py
 
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 import logging
 
 from src.preprocessing.worker import Worker
 from src.preprocessing.parsers.parser_factory import ParserFactory
 from src.preprocessing.parsers.document_parser import IDocumentParser
-from src.models import ProcessorResult
+from src.models import ProcessorResult, TextChunk, make_document_id
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +20,13 @@ class Preprocessor:
     def __init__(
         self,
         workers: Optional[List[Worker]] = None,
-        default_parser: str = "auto",  # 'pdf', 'txt', 'auto'
+        default_parser: str = "auto",  # 'pdf', 'txt', 'auto', 'auto_size'
     ):
         """
         Args:
             workers: Список workers для обробки тексту
-            default_parser: Дефолтний парсер або 'auto' для автовизначення
+            default_parser: Дефолтний парсер, 'auto' для автовизначення
+                або 'auto_size' (з урахуванням кількості сторінок PDF)
         """
         self.default_parser = default_parser
 
@@ -66,44 +67,37 @@ class Preprocessor:
 
         Args:
             file_path: Шлях до файлу
-            parser: Парсер ('pdf', 'txt', 'auto') або екземпляр IDocumentParser
+            parser: Парсер ('pdf', 'txt', 'auto', 'auto_size') або екземпляр IDocumentParser
             enable_chunking: Чи розбивати на чанки
             **chunking_kwargs: Параметри для chunking
 
         Returns:
             ProcessorResult з обробленим текстом та чанками
         """
-        logger.info(f"Обробка документа: {file_path}")
+        logger.info("Обробка документа: %s", file_path)
 
         # 1. Визначаємо парсер
-        if parser is None:
-            parser = self.default_parser
-
-        if isinstance(parser, str):
-            if parser == "auto":
-                parser_instance = ParserFactory.auto_detect(file_path)
-            else:
-                parser_instance = ParserFactory.create(parser)
+        parser_instance = self._resolve_parser(file_path, parser)
+
+        # 2-3. Парсимо документ і обробляємо через workers
+        windows = None
+        if parser_instance.streaming:
+            # Великі документи: текст надходить через parse_stream, workers
+            # працюють на вікнах (по межах параграфів), а не на всьому тексті
+            windows, applied_workers = [], None
+            for window in self._iter_windows(file_path, parser_instance):
+                window, applied = self._apply_workers(window)
+                windows.append(window)
+                applied_workers = applied if applied_workers is None else [
+                    name for name in applied_workers if name in applied]
+            processed_text = "".join(windows)
+            applied_workers = applied_workers or []
         else:
-            parser_instance = parser
-
-        # 2. Парсимо документ
-        logger.info(f"Використовується парсер: {parser_instance.__class__.__name__}")
-        raw_text = parser_instance.parse(file_path)
-        logger.info(f"Витягнуто {len(raw_text)} символів")
-
-        # 3. Обробка через workers
-        processed_text = raw_text
-        applied_workers = []
+            raw_text = parser_instance.parse(file_path)
+            logger.info("Витягнуто %s символів", len(raw_text))
+            processed_text, applied_workers = self._apply_workers(raw_text)
 
-        for worker in self.workers:
-            try:
-                processed_text = worker.process(processed_text)
-                applied_workers.append(worker.__class__.__name__)
-            except Exception as e:
-                logger.error(f"Помилка в worker {worker.__class__.__name__}: {e}")
-
-        logger.info(f"Результат після воркерів: {len(processed_text)} символів")
+        logger.info("Результат після воркерів: %s символів", len(processed_text))
 
         # 4. Створюємо результат
         result = ProcessorResult(
@@ -121,16 +115,97 @@ class Preprocessor:
 
         # 5. Chunking
         if enable_chunking:
-            from src.preprocessing.chunker import ChunkerFactory, ChunkingConfig
+            chunker = self._create_chunker(chunking_kwargs)
+            if windows is None:
+                result.chunks = chunker.chunk(processed_text, result.document_id)
+            else:
+                result.chunks = list(chunker.chunk_parts(windows, result.document_id))
+            logger.info("Створено %s чанків", len(result.chunks))
 
-            chunking_strategy = chunking_kwargs.pop("chunking_strategy", "semantic")
-            config = ChunkingConfig(
-                chunk_size=chunking_kwargs.get("chunk_size", 800),
-                chunk_overlap=chunking_kwargs.get("chunk_overlap", 150),
-            )
+        return result
 
-            chunker = ChunkerFactory.create(chunking_strategy, config)
-            result.chunks = chunker.chunk(processed_text, result.document_id)
-            logger.info(f"Створено {len(result.chunks)} чанків")
+    def process_document_stream(
+        self,
+        file_path: str,
+        parser: Optional[Union[str, IDocumentParser]] = None,
+        **chunking_kwargs,
+    ) -> Iterator[TextChunk]:
+        """
+        Потокова обробка документа: parser.parse_stream -> вікна тексту
+        (по межах параграфів) -> workers на кожному вікні -> chunks.
+        У пам'яті одне вікно (~STREAM_BUFFER_SIZE символів), а не весь текст;
+        для документів, менших за вікно, chunks збігаються з process_document.
 
-        return result
+        Args:
+            file_path: Шлях до файлу
+            parser: Парсер ('pdf', 'txt', 'auto', 'auto_size') або екземпляр IDocumentParser
+            **chunking_kwargs: Параметри для chunking
+
+        Yields:
+            TextChunk у порядку документа
+        """
+        logger.info("Потокова обробка документа: %s", file_path)
+
+        parser_instance = self._resolve_parser(file_path, parser)
+        chunker = self._create_chunker(chunking_kwargs)
+
+        processed = (
+            self._apply_workers(window)[0]
+            for window in self._iter_windows(file_path, parser_instance)
+        )
+
+        yield from chunker.chunk_parts(processed, make_document_id(Path(file_path).name))
+
+    @staticmethod
+    def _iter_windows(file_path: str, parser_instance: IDocumentParser) -> Iterator[str]:
+        """Сирий текст parse_stream, зібраний у вікна по межах параграфів"""
+        from src.preprocessing.chunker import BaseChunker, iter_text_windows
+
+        return iter_text_windows(
+            parser_instance.parse_stream(file_path), BaseChunker.STREAM_BUFFER_SIZE
+        )
+
+    def _resolve_parser(
+        self, file_path: str, parser: Optional[Union[str, IDocumentParser]]
+    ) -> IDocumentParser:
+        """Екземпляр парсера за назвою (або дефолтний) для file_path"""
+        if parser is None:
+            parser = self.default_parser
+
+        if isinstance(parser, str):
+            if parser == "auto":
+                parser_instance = ParserFactory.auto_detect(file_path)
+            elif parser == "auto_size":
+                parser_instance = ParserFactory.auto_detect_by_size(file_path)
+            else:
+                parser_instance = ParserFactory.create(parser)
+        else:
+            parser_instance = parser
+
+        logger.info("Використовується парсер: %s", parser_instance.__class__.__name__)
+        return parser_instance
+
+    def _apply_workers(self, text: str) -> Tuple[str, List[str]]:
+        """Пропускає текст через workers; повертає (текст, назви застосованих workers)"""
+        applied_workers = []
+
+        for worker in self.workers:
+            try:
+                text = worker.process(text)
+                applied_workers.append(worker.__class__.__name__)
+            except Exception as e:
+                logger.error("Помилка в worker %s: %s", worker.__class__.__name__, e)
+
+        return text, applied_workers
+
+    @staticmethod
+    def _create_chunker(chunking_kwargs: dict):
+        from src.preprocessing.chunker import ChunkerFactory, ChunkingConfig
+
+        chunking_strategy = chunking_kwargs.get("chunking_strategy", "semantic")
+        config = ChunkingConfig(
+            chunk_size=chunking_kwargs.get("chunk_size", 800),
+            chunk_overlap=chunking_kwargs.get("chunk_overlap", 150),
+            cache_size=chunking_kwargs.get("chunk_cache_size", 0),
+        )
+        return ChunkerFactory.create(chunking_strategy, config)
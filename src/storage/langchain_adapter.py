@@ -0,0 +1,252 @@
+import logging
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.embeddings.embedder import EmbedderFactory, IEmbedder
+from src.models import TextChunk
+
+logger = logging.getLogger(__name__)
+
+
+class EmbedderLangChainAdapter(Embeddings):
+    """
+    Обгортка IEmbedder під інтерфейс LangChain Embeddings.
+    """
+
+    def __init__(self, embedder: IEmbedder):
+        self.embedder = embedder
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        chunks = [
+            TextChunk(text=text, chunk_id=f"doc_{i}", document_id="langchain")
+            for i, text in enumerate(texts)
+        ]
+        return self.embedder.embed_matrix(chunks).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embedder.embed_single(text).tolist()
+
+
+class _NormalizedEmbeddings(Embeddings):
+    """
+    L2-нормалізує вектори іншого Embeddings: для inner product індексу
+    (cosine similarity) без normalize_L2 у LangChain FAISS.
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+
+    @staticmethod
+    def _normalize(vectors: List[List[float]]) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._normalize(self.embeddings.embed_documents(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._normalize([self.embeddings.embed_query(text)])[0].tolist()
+
+
+class FAISSLangChainAdapter:
+    """
+    Адаптер між індексом FAISSStorage (.faiss + .pkl) та LangChain FAISS vectorstore.
+    Пошук іде через HNSW граф (~log(N) на запит) замість повного перебору;
+    великі бази (> IVFPQ_MIN_VECTORS) стискаються в IVFPQ FastScan (4-bit PQ).
+    Побудовані тут індекси - L2 по нормалізованих векторах: ранжування таке саме,
+    як за cosine similarity, а LangChain коректно рахує relevance score.
+    """
+
+    IVFPQ_MIN_VECTORS = 100_000
+    IVFPQ_TRAIN_SAMPLE = 100_000
+    IVFPQ_NPROBE = 16
+
+    @staticmethod
+    def _create_hnsw_index(
+        dimension: int, hnsw_m: int, ef_construction: int, ef_search: int
+    ) -> faiss.IndexHNSWFlat:
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m, faiss.METRIC_L2)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+        return index
+
+    @staticmethod
+    def _create_ivfpq_index(vectors: np.ndarray) -> faiss.Index:
+        """
+        IVFPQ з 4-bit FastScan: ~dim/8 байт на вектор замість dim*4,
+        відстані рахуються SIMD lookup-таблицями в регістрах.
+        """
+        n, dim = vectors.shape
+        nlist = int(4 * np.sqrt(n))
+
+        quantizer = faiss.IndexHNSWFlat(dim, 32)
+        index = faiss.IndexIVFPQFastScan(
+            quantizer, dim, nlist, dim // 4, 4, faiss.METRIC_L2
+        )
+
+        # Навчання на випадковій підвибірці
+        if n > FAISSLangChainAdapter.IVFPQ_TRAIN_SAMPLE:
+            rng = np.random.default_rng(0)
+            sample = vectors[
+                rng.choice(n, FAISSLangChainAdapter.IVFPQ_TRAIN_SAMPLE, replace=False)
+            ]
+        else:
+            sample = vectors
+        index.train(sample)
+        index.nprobe = FAISSLangChainAdapter.IVFPQ_NPROBE
+
+        logger.info("IVFPQ FastScan індекс: nlist=%s, M=%s", nlist, dim // 4)
+        return index
+
+    @staticmethod
+    def _build_index(
+        vectors: np.ndarray, hnsw_m: int, ef_construction: int, ef_search: int
+    ) -> faiss.Index:
+        """HNSW для звичайних баз, IVFPQ FastScan для великих; вектори додаються"""
+        if len(vectors) > FAISSLangChainAdapter.IVFPQ_MIN_VECTORS:
+            index = FAISSLangChainAdapter._create_ivfpq_index(vectors)
+        else:
+            index = FAISSLangChainAdapter._create_hnsw_index(
+                vectors.shape[1], hnsw_m, ef_construction, ef_search
+            )
+        index.add(vectors)
+        return index
+
+    @staticmethod
+    def _make_vectorstore(
+        index: faiss.Index,
+        documents: List[Document],
+        embeddings: Embeddings,
+    ) -> FAISS:
+        """
+        Збирає LangChain FAISS з готового індексу; faiss_id == позиція документа.
+        L2 індекс - EUCLIDEAN_DISTANCE з normalize_L2 (запити нормалізує LangChain);
+        inner product індекс (HNSW з FAISSStorage) - MAX_INNER_PRODUCT, запити
+        нормалізує _NormalizedEmbeddings (normalize_L2 LangChain тут не застосовний).
+        """
+        docstore = InMemoryDocstore({str(i): doc for i, doc in enumerate(documents)})
+        index_to_docstore_id = {i: str(i) for i in range(len(documents))}
+
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return FAISS(
+                embedding_function=_NormalizedEmbeddings(embeddings),
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id,
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            )
+
+        return FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            normalize_L2=True,
+            distance_strategy=DistanceStrategy.EUCLIDEAN_DISTANCE,
+        )
+
+    @staticmethod
+    def build_faiss(
+        documents: List[Document],
+        embeddings: Embeddings,
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ) -> FAISS:
+        """
+        Створює LangChain FAISS vectorstore на HNSW індексі
+        (або IVFPQ FastScan, якщо векторів більше IVFPQ_MIN_VECTORS).
+
+        Args:
+            documents: Документи для індексації
+            embeddings: LangChain Embeddings
+            hnsw_m: Кількість зв'язків на вузол графа HNSW
+            ef_construction: Ширина пошуку при побудові графа
+            ef_search: Ширина пошуку при запиті (більше = точніше, повільніше)
+        """
+        vectors = np.asarray(
+            embeddings.embed_documents([doc.page_content for doc in documents]),
+            dtype=np.float32,
+        )
+        faiss.normalize_L2(vectors)
+
+        index = FAISSLangChainAdapter._build_index(
+            vectors, hnsw_m, ef_construction, ef_search
+        )
+
+        logger.info("Індекс побудовано: %s векторів", index.ntotal)
+        return FAISSLangChainAdapter._make_vectorstore(index, documents, embeddings)
+
+    @staticmethod
+    def load_faiss(
+        index_path: str | Path,
+        embeddings: Optional[Embeddings] = None,
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ) -> FAISS:
+        """
+        Завантажує індекс, збережений FAISSStorage.save(), як LangChain FAISS.
+        HNSW індекс використовується як є (через mmap); flat / sq8 перебудовується
+        в HNSW або IVFPQ FastScan.
+
+        Args:
+            index_path: Шлях без розширення (.faiss та .pkl)
+            embeddings: LangChain Embeddings (за замовчуванням SBERT)
+            hnsw_m: Кількість зв'язків на вузол графа HNSW
+            ef_construction: Ширина пошуку при побудові графа
+            ef_search: Ширина пошуку при запиті
+        """
+        faiss_path = str(index_path) + ".faiss"
+        metadata_path = str(index_path) + ".pkl"
+
+        if not Path(faiss_path).exists():
+            raise FileNotFoundError(f"FAISS індекс не знайдено: {faiss_path}")
+        if not Path(metadata_path).exists():
+            raise FileNotFoundError(f"Metadata не знайдено: {metadata_path}")
+
+        with open(metadata_path, "rb") as f:
+            metadata = pickle.load(f)
+
+        metadata_store: Dict[int, TextChunk] = metadata["metadata_store"]
+        aliases: Dict[int, List[TextChunk]] = metadata.get("aliases", {})
+        documents = []
+        for faiss_id, chunk in sorted(metadata_store.items()):
+            doc_metadata = dict(chunk.metadata)
+            if faiss_id in aliases:
+                # Той самий текст в інших документах (дедуплікація при індексації)
+                doc_metadata["alias_document_ids"] = [
+                    alias.document_id for alias in aliases[faiss_id]
+                ]
+            documents.append(Document(page_content=chunk.text, metadata=doc_metadata))
+
+        if metadata.get("index_type", "flat").startswith("hnsw"):
+            # mmap: сторінки індексу підвантажуються ядром на вимогу, без читання файлу цілком
+            index = faiss.read_index(
+                faiss_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            index.hnsw.efSearch = ef_search
+        else:
+            # Перебудова все одно копіює всі вектори - mmap нічого не заощадить
+            index = faiss.read_index(faiss_path)
+            logger.info("Перебудова flat індексу (%s векторів)", index.ntotal)
+            vectors = index.reconstruct_n(0, index.ntotal)
+            faiss.normalize_L2(vectors)
+            index = FAISSLangChainAdapter._build_index(
+                vectors, hnsw_m, ef_construction, ef_search
+            )
+
+        if embeddings is None:
+            embeddings = EmbedderLangChainAdapter(EmbedderFactory.create("sbert"))
+
+        return FAISSLangChainAdapter._make_vectorstore(index, documents, embeddings)
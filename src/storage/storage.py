@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Union
 import numpy as np
 import faiss
 import pickle
@@ -14,16 +14,44 @@ logger = logging.getLogger(__name__)
 class IStorage(ABC):
     """Базовий інтерфейс для векторного сховища"""
 
+    # Лічильник змін вмісту (add / load / clear): кеші результатів пошуку
+    # ключуються ним, тож після оновлення індексу не віддають застарілі результати
+    version: int = 0
+
     @abstractmethod
     def add(self, embeddings: List[EmbedderResult], chunks: List[TextChunk]) -> None:
         """Додає вектори в індекс"""
         pass
 
     @abstractmethod
-    def search(self, query_vector: List[float], top_k: int = 4) -> List[SearchResult]:
+    def add_vectors(self, vectors: np.ndarray, chunks: List[TextChunk]) -> None:
+        """Додає матрицю векторів (N, dim) в індекс; рядок i відповідає chunks[i]"""
+        pass
+
+    @abstractmethod
+    def add_alias(self, chunk: TextChunk, original_chunk_id: str) -> None:
+        """Прив'язує chunk_id дубліката до вектора вже доданого чанка"""
+        pass
+
+    @abstractmethod
+    def iter_chunks(self) -> Iterator[TextChunk]:
+        """Чанки, що мають власний вектор (без аліасів)"""
+        pass
+
+    @abstractmethod
+    def search(
+        self, query_vector: Union[np.ndarray, List[float]], top_k: int = 4
+    ) -> List[SearchResult]:
         """Знаходить top_k найбільш схожих чанків"""
         pass
 
+    @abstractmethod
+    def search_batch(
+        self, query_vectors: np.ndarray, top_k: int = 4
+    ) -> List[List[SearchResult]]:
+        """Пошук для матриці запитів (N, dim) одним викликом; рядок i -> результати i"""
+        pass
+
     @abstractmethod
     def save(self, file_path: str | Path) -> None:
         """Зберігає індекс на диск"""
@@ -50,35 +78,114 @@ class FAISSStorage(IStorage):
     Storage на базі FAISS (Facebook AI Similarity Search).
     """
 
-    def __init__(self, dimension: int = 384, normalize_vectors: bool = True):
+    # Підтримувані типи FAISS індексів
+    INDEX_TYPES = ("flat", "sq8", "hnsw", "hnsw_sq8")
+
+    def __init__(
+        self,
+        dimension: int = 384,
+        normalize_vectors: bool = True,
+        index_type: str = "flat",
+        hnsw_m: int = 32,
+        hnsw_ef_search: int = 64,
+        embedder_info: Optional[Dict[str, Any]] = None,
+    ):
         """
         Args:
             dimension: Розмірність векторів (384 для all-MiniLM-L6-v2)
             normalize_vectors: Нормалізувати вектори для cosine similarity
+            index_type: 'flat' (точний пошук), 'sq8' (точний перебір по int8 кодах),
+                        'hnsw' (approximate, ~log(N) на запит)
+                        або 'hnsw_sq8' (HNSW з int8 scalar quantization: 1 байт/вимір
+                        замість 4, вчетверо менше пам'яті та трафіку при пошуку)
+            hnsw_m: Кількість зв'язків на вузол графа HNSW
+            hnsw_ef_search: Ширина пошуку HNSW (більше = точніше, повільніше)
+            embedder_info: Параметри embedder'а (model_name, precision); зберігаються
+                           в metadata індексу, при load розбіжність зі збереженими логується
         """
+        index_type = index_type.lower()
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(
+                f"Unknown index type: {index_type}. Available: {list(self.INDEX_TYPES)}"
+            )
+
         self.dimension = dimension
         self.normalize_vectors = normalize_vectors
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        self.embedder_info: Dict[str, Any] = dict(embedder_info or {})
 
         # FAISS індекс
-        self.index = faiss.IndexFlatIP(self.dimension)
+        self.index = self._create_index()
 
         # Metadata storage
         self.metadata_store: Dict[int, TextChunk] = {}  # faiss_id -> TextChunk
         self.chunk_id_to_faiss_id: Dict[str, int] = {}  # chunk_id -> faiss_id
+        # faiss_id -> чанки-дублікати (той самий текст в інших документах)
+        self.aliases: Dict[int, List[TextChunk]] = {}
 
         # Лічильник для нових ID
         self.next_id = 0
 
-        logger.info(f"FAISSStorage ініціалізовано: dim={dimension}")
+        logger.info(
+            "FAISSStorage ініціалізовано: dim=%s, index_type=%s", dimension, index_type
+        )
+
+    def _create_index(self) -> faiss.Index:
+        """Створює порожній FAISS індекс (inner product) заданого типу"""
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(
+                self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT
+            )
+            index.hnsw.efSearch = self.hnsw_ef_search
+            return index
+
+        if self.index_type == "hnsw_sq8":
+            index = faiss.IndexHNSWSQ(
+                self.dimension,
+                faiss.ScalarQuantizer.QT_8bit,
+                self.hnsw_m,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            index.hnsw.efSearch = self.hnsw_ef_search
+            self._train_fixed_range(index)
+            return index
+
+        if self.index_type == "sq8":
+            index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            self._train_fixed_range(index)
+            return index
+
+        return faiss.IndexFlatIP(self.dimension)
+
+    def _train_fixed_range(self, index: faiss.Index) -> None:
+        """
+        Нормалізовані вектори лежать у [-1, 1] по кожному виміру: квантизатор
+        навчається на цих межах (RS_minmax), а не на першій партії даних,
+        тож пізніші вектори не обрізаються діапазоном першого batch'а.
+        """
+        if not self.normalize_vectors:
+            return
+        bounds = np.empty((2, self.dimension), dtype=np.float32)
+        bounds[0] = -1.0
+        bounds[1] = 1.0
+        index.train(bounds)
 
     def _normalize(self, vectors: np.ndarray) -> np.ndarray:
-        """L2 нормалізація векторів для cosine similarity"""
+        """
+        L2 нормалізація векторів для cosine similarity (inner product в IndexFlatIP).
+        Виконується одним in-place проходом faiss.normalize_L2 над копією;
+        нульові вектори лишаються нульовими.
+        """
         if not self.normalize_vectors:
-            return vectors
+            return np.ascontiguousarray(vectors, dtype=np.float32)
 
-        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
-        norms[norms == 0] = 1  # Уникаємо ділення на 0
-        return vectors / norms
+        vectors = np.array(vectors, dtype=np.float32, order="C")
+        faiss.normalize_L2(vectors)
+        return vectors
 
     def add(self, embeddings: List[EmbedderResult], chunks: List[TextChunk]) -> None:
         """
@@ -96,60 +203,95 @@ class FAISSStorage(IStorage):
                 f"Кількість embeddings ({len(embeddings)}) не співпадає з chunks ({len(chunks)})"
             )
 
-        logger.info(f"Додавання {len(embeddings)} векторів в індекс")
+        for emb, chunk in zip(embeddings, chunks):
+            if emb.chunk_id != chunk.chunk_id:
+                logger.warning(
+                    "chunk_id не співпадає: emb=%s, chunk=%s",
+                    emb.chunk_id,
+                    chunk.chunk_id,
+                )
 
         # Конвертуємо в numpy array
-        vectors = np.array([emb.vector for emb in embeddings], dtype=np.float32)
+        vectors = np.stack([emb.vector for emb in embeddings]).astype(
+            np.float32, copy=False
+        )
+        self.add_vectors(vectors, chunks)
+
+    def add_vectors(self, vectors: np.ndarray, chunks: List[TextChunk]) -> None:
+        """
+        Додає суцільну матрицю векторів (N, dim) в індекс одним викликом FAISS.
+
+        Args:
+            vectors: Матриця векторів; рядок i відповідає chunks[i]
+            chunks: Чанки для metadata
+        """
+        if len(vectors) == 0:
+            logger.warning("Отримано порожню матрицю векторів")
+            return
+
+        if len(vectors) != len(chunks):
+            raise ValueError(
+                f"Кількість векторів ({len(vectors)}) не співпадає з chunks ({len(chunks)})"
+            )
 
-        # Нормалізуємо
+        logger.info("Додавання %s векторів в індекс", len(vectors))
+
+        # Нормалізуємо (один раз, при додаванні)
         vectors = self._normalize(vectors)
 
+        # Без нормалізації меж заздалегідь не знаємо: квантизатор (sq8) навчається
+        # на першій партії, і вектори поза її діапазоном обрізаються
+        if not self.index.is_trained:
+            logger.warning(
+                "Scalar quantizer навчається на першій партії (%s векторів) - "
+                "додавайте репрезентативну вибірку корпусу першою",
+                len(vectors),
+            )
+            self.index.train(vectors)
+
         # Додаємо в FAISS
         self.index.add(vectors)
 
         # Зберігаємо metadata
-        for i, (emb, chunk) in enumerate(zip(embeddings, chunks)):
+        for i, chunk in enumerate(chunks):
             faiss_id = self.next_id + i
-
-            if emb.chunk_id != chunk.chunk_id:
-                logger.warning(
-                    f"chunk_id не співпадає: emb={emb.chunk_id}, chunk={chunk.chunk_id}"
-                )
-
             self.metadata_store[faiss_id] = chunk
             self.chunk_id_to_faiss_id[chunk.chunk_id] = faiss_id
 
-        self.next_id += len(embeddings)
+        self.next_id += len(vectors)
+        self.version += 1
 
-        logger.info(f"Додано успішно. Всього векторів в індексі: {self.index.ntotal}")
+        logger.info("Додано успішно. Всього векторів в індексі: %s", self.index.ntotal)
 
-    def search(self, query_vector: List[float], top_k: int = 4) -> List[SearchResult]:
+    def add_alias(self, chunk: TextChunk, original_chunk_id: str) -> None:
         """
-        Знаходить top_k найбільш схожих чанків.
+        Реєструє чанк-дублікат без додавання нового вектора:
+        його chunk_id вказує на faiss_id оригінального чанка, а сам чанк
+        (з document_id та metadata) повертається в SearchResult.metadata["aliases"].
         """
-        if self.index.ntotal == 0:
-            logger.warning("Індекс порожній, неможливо виконати пошук")
-            return []
-
-        # Конвертуємо в numpy
-        query = np.array([query_vector], dtype=np.float32)
-        query = self._normalize(query)
+        faiss_id = self.chunk_id_to_faiss_id.get(original_chunk_id)
+        if faiss_id is None:
+            raise KeyError(f"Оригінальний чанк не знайдено: {original_chunk_id}")
 
-        # Обмежуємо top_k до кількості векторів в індексі
-        top_k = min(top_k, self.index.ntotal)
+        self.chunk_id_to_faiss_id[chunk.chunk_id] = faiss_id
+        self.aliases.setdefault(faiss_id, []).append(chunk)
+        self.version += 1
 
-        # Пошук в FAISS
-        distances, indices = self.index.search(query, top_k)
+    def iter_chunks(self) -> Iterator[TextChunk]:
+        return iter(self.metadata_store.values())
 
-        # Конвертуємо в SearchResult
+    def _to_results(
+        self, distances: np.ndarray, indices: np.ndarray
+    ) -> List[SearchResult]:
+        """Конвертує один рядок відповіді FAISS у список SearchResult"""
         results = []
-        for dist, idx in zip(distances[0], indices[0]):
+        for dist, idx in zip(distances, indices):
             if idx == -1:  # FAISS повертає -1 якщо не знайдено
                 continue
 
             chunk = self.metadata_store.get(idx)
             if chunk is None:
-                logger.warning(f"Метадані для індексу {idx} не знайдено")
+                logger.warning("Метадані для індексу %s не знайдено", idx)
                 continue
 
             # Конвертуємо distance (inner product) в similarity score (0-1)
@@ -157,18 +299,61 @@ class FAISSStorage(IStorage):
             # Конвертуємо в [0, 1]: (inner_product + 1) / 2
             score = float((dist + 1) / 2)
 
+            # Дублікати з інших документів - джерела з тим самим текстом
+            aliases = self.aliases.get(int(idx))
+
             results.append(
                 SearchResult(
                     chunk=chunk,
                     score=score,
                     document_id=chunk.document_id,
                     chunk_id=chunk.chunk_id,
+                    metadata={"aliases": list(aliases)} if aliases else {},
                 )
             )
+        return results
 
-        logger.info(f"Знайдено {len(results)} результатів")
+    def search(
+        self, query_vector: Union[np.ndarray, List[float]], top_k: int = 4
+    ) -> List[SearchResult]:
+        """
+        Знаходить top_k найбільш схожих чанків.
+        float32 ndarray (напр. з embed_single) використовується без копії.
+        """
+        if self.index.ntotal == 0:
+            logger.warning("Індекс порожній, неможливо виконати пошук")
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        results = self.search_batch(query, top_k)[0]
+
+        logger.info("Знайдено %s результатів", len(results))
         return results
 
+    def search_batch(
+        self, query_vectors: np.ndarray, top_k: int = 4
+    ) -> List[List[SearchResult]]:
+        """
+        Пошук для матриці запитів (N, dim) одним викликом FAISS
+        (distance kernel амортизується на всю матрицю).
+
+        Returns:
+            Список результатів для кожного рядка query_vectors
+        """
+        if self.index.ntotal == 0 or len(query_vectors) == 0:
+            return [[] for _ in range(len(query_vectors))]
+
+        queries = self._normalize(query_vectors)
+
+        # Обмежуємо top_k до кількості векторів в індексі
+        top_k = min(top_k, self.index.ntotal)
+
+        distances, indices = self.index.search(queries, top_k)
+
+        return [
+            self._to_results(distances[i], indices[i]) for i in range(len(queries))
+        ]
+
     def save(self, file_path: str | Path) -> None:
         """
         Зберігає індекс + metadata на диск.
@@ -188,14 +373,17 @@ class FAISSStorage(IStorage):
         metadata = {
             "metadata_store": self.metadata_store,
             "chunk_id_to_faiss_id": self.chunk_id_to_faiss_id,
+            "aliases": self.aliases,
             "next_id": self.next_id,
             "dimension": self.dimension,
+            "index_type": self.index_type,
+            "embedder_info": self.embedder_info,
         }
 
         with open(metadata_path, "wb") as f:
             pickle.dump(metadata, f)
 
-        logger.info(f"Індекс збережено: {faiss_path}, {metadata_path}")
+        logger.info("Індекс збережено: %s, %s", faiss_path, metadata_path)
 
     def load(self, file_path: str | Path) -> None:
         """
@@ -222,35 +410,65 @@ class FAISSStorage(IStorage):
 
         self.metadata_store = metadata["metadata_store"]
         self.chunk_id_to_faiss_id = metadata["chunk_id_to_faiss_id"]
+        self.aliases = metadata.get("aliases", {})
         self.next_id = metadata["next_id"]
+        self.index_type = metadata.get("index_type", "flat")
+
+        if self.index_type.startswith("hnsw"):
+            self.index.hnsw.efSearch = self.hnsw_ef_search
+
+        self.version += 1
 
         # Перевірка розмірності
         if metadata["dimension"] != self.dimension:
             logger.warning(
-                f"Розмірність індексу ({metadata['dimension']}) "
-                f"не співпадає з очікуваною ({self.dimension})"
+                "Розмірність індексу (%s) не співпадає з очікуваною (%s)",
+                metadata['dimension'],
+                self.dimension,
             )
 
-        logger.info(f"Індекс завантажено: {self.index.ntotal} векторів")
+        # Вектори запитів мають бути в тому ж просторі, що й вектори документів
+        stored_info = metadata.get("embedder_info", {})
+        for key, value in stored_info.items():
+            expected = self.embedder_info.get(key)
+            if expected is not None and expected != value:
+                logger.warning(
+                    "Індекс створено з embedder %s=%s, а очікується %s: "
+                    "якість пошуку може знизитись",
+                    key,
+                    value,
+                    expected,
+                )
+        # Після load - параметри embedder'а, яким векторизовано вміст індексу
+        self.embedder_info = dict(stored_info) or self.embedder_info
+
+        logger.info("Індекс завантажено: %s векторів", self.index.ntotal)
 
     def clear(self) -> None:
         """Очищає індекс та metadata"""
-        self.index = faiss.IndexFlatIP(self.dimension)
+        self.index = self._create_index()
         self.metadata_store.clear()
         self.chunk_id_to_faiss_id.clear()
+        self.aliases.clear()
         self.next_id = 0
+        self.version += 1
         logger.info("Індекс очищено")
 
     def get_stats(self) -> Dict[str, int]:
         """Повертає статистику індексу"""
         unique_docs = len(
-            set(chunk.document_id for chunk in self.metadata_store.values())
+            set(chunk.document_id for chunk in self.metadata_store.values()).union(
+                chunk.document_id
+                for chunks in self.aliases.values()
+                for chunk in chunks
+            )
         )
         return {
             "total_vectors": self.index.ntotal,
             "dimension": self.dimension,
             "unique_documents": unique_docs,
             "normalize_vectors": self.normalize_vectors,
+            "index_type": self.index_type,
             "metadata_count": len(self.metadata_store),
         }
 
@@ -276,6 +494,7 @@ class StorageFactory:
             return FAISSStorage(
                 dimension=kwargs.get("dimension", 384),
                 normalize_vectors=kwargs.get("normalize_vectors", True),
+                index_type=kwargs.get("index_type", "flat"),
             )
         else:
             raise ValueError(f"Unknown storage type: {storage_type}")
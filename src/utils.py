@@ -4,6 +4,8 @@ from typing import Dict, Tuple
 from dotenv import load_dotenv
 import logging
 
+from config.logging_config import configure_logging
+
 
 def load_environment(env_path: str = '.env') -> Dict[str, str]:
     """
@@ -50,12 +52,8 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
     Args:
         log_level (str): Logging level (e.g., "INFO", "DEBUG", "ERROR").
     """
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper(), logging.INFO),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    logger = logging.getLogger(__name__)
-    return logger
+    configure_logging(log_level)
+    return logging.getLogger(__name__)
 
 
 
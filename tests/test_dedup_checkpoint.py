@@ -0,0 +1,204 @@
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+import main
+from main import _embed_and_store, _load_checkpoint, _save_checkpoint, index_documents
+from src.models import TextChunk
+from src.storage.storage import FAISSStorage
+
+DIM = 8
+
+
+class CountingEmbedder:
+    """Детермінований embedder (вектор = хеш тексту), рахує заемб'ежені чанки"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_matrix(self, chunks):
+        self.embedded += len(chunks)
+        vectors = np.stack([
+            np.frombuffer(hashlib.sha256(c.text.encode("utf-8")).digest()[:DIM],
+                          dtype=np.uint8).astype(np.float32) + 1.0
+            for c in chunks
+        ])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class _Result:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+
+class FakePreprocessor:
+    """Повертає 2 чанки на файл (унікальний + спільний); може 'впасти' на N-му файлі"""
+
+    def __init__(self, fail_on_call=None):
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def process_document(self, file_path, **kwargs):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("імітація падіння")
+        name = Path(file_path).stem
+        return _Result([
+            TextChunk(text=f"{name} унікальний текст", chunk_id=f"{name}_0",
+                      document_id=name),
+            TextChunk(text="спільний текст", chunk_id=f"{name}_1",
+                      document_id=name, metadata={"source": name}),
+        ])
+
+    def process_document_stream(self, file_path, **kwargs):
+        yield from self.process_document(file_path, **kwargs).chunks
+
+
+def test_duplicate_keeps_metadata():
+    """Дублікат з іншого документа стає alias і зберігає свої метадані"""
+
+    print("=" * 60)
+    print("ТЕСТ: Дублікат чанка зберігає метадані через alias")
+    print("=" * 60)
+
+    embedder = CountingEmbedder()
+    storage = FAISSStorage(dimension=DIM)
+    original = TextChunk(text="однаковий текст", chunk_id="a_0",
+                         document_id="a", metadata={"page": 1})
+    duplicate = TextChunk(text="однаковий текст", chunk_id="b_0",
+                          document_id="b", metadata={"page": 7})
+
+    _embed_and_store(embedder, storage, [original, duplicate], {})
+
+    assert storage.index.ntotal == 1, "Дублікат не має додавати вектор"
+    assert embedder.embedded == 1, "Дублікат не має ембеддитись"
+
+    query = embedder.embed_matrix([original])[0]
+    for label, s in (("до save", storage), ("після load", None)):
+        if s is None:
+            with tempfile.TemporaryDirectory() as tmp:
+                storage.save(Path(tmp) / "idx")
+                s = FAISSStorage(dimension=DIM)
+                s.load(Path(tmp) / "idx")
+        result = s.search(query, top_k=1)[0]
+        aliases = result.metadata["aliases"]
+        assert result.chunk.document_id == "a", f"{label}: змінився оригінал"
+        assert len(aliases) == 1, f"{label}: alias втрачено"
+        assert aliases[0].document_id == "b", f"{label}: невірний document_id alias"
+        assert aliases[0].metadata == {"page": 7}, f"{label}: метадані alias втрачено"
+        print(f"   ✅ {label}: alias {aliases[0].chunk_id} -> {aliases[0].metadata}")
+
+    print("\n🎉 Тест пройдено успішно!\n")
+
+
+def test_resume_without_readding():
+    """Відновлення після падіння: оброблені файли й вектори не додаються повторно"""
+
+    print("=" * 60)
+    print("ТЕСТ: Відновлення з checkpoint без повторного додавання векторів")
+    print("=" * 60)
+
+    checkpoint_every = main.CHECKPOINT_EVERY
+    main.CHECKPOINT_EVERY = 2
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp) / "raw"
+            data_dir.mkdir()
+            for name in "abcde":
+                (data_dir / f"{name}.txt").write_text(name, encoding="utf-8")
+            index_path = str(Path(tmp) / "idx")
+
+            # Перший запуск падає на 3-му файлі: checkpoint містить 2 файли
+            try:
+                index_documents(FakePreprocessor(fail_on_call=3), CountingEmbedder(),
+                                FAISSStorage(dimension=DIM), data_dir=str(data_dir),
+                                index_path=index_path)
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("Перший запуск мав впасти")
+
+            assert len(_load_checkpoint(FAISSStorage(dimension=DIM), index_path)) == 2, \
+                "Checkpoint має містити 2 оброблені файли"
+
+            # Другий запуск: лише 3 файли, лише 3 нові унікальні чанки
+            preprocessor = FakePreprocessor()
+            embedder = CountingEmbedder()
+            storage = FAISSStorage(dimension=DIM)
+            index_documents(preprocessor, embedder, storage, data_dir=str(data_dir),
+                            index_path=index_path)
+
+            print(f"   Оброблено файлів: {preprocessor.calls}, "
+                  f"заемб'ежено чанків: {embedder.embedded}, "
+                  f"векторів: {storage.index.ntotal}")
+            assert preprocessor.calls == 3, "Оброблені файли не мають оброблятись знову"
+            assert embedder.embedded == 3, "Спільний чанк має дедуплікуватись після resume"
+            assert storage.index.ntotal == 6, "5 унікальних + 1 спільний вектор"
+            assert not Path(f"{index_path}.ckpt.json").exists(), \
+                "Checkpoint має видалятись після успішного завершення"
+    finally:
+        main.CHECKPOINT_EVERY = checkpoint_every
+
+    print("\n🎉 Тест пройдено успішно!\n")
+
+
+def test_checkpoint_atomic_replace():
+    """Checkpoint замінюється атомарно; перерваний запис не дає неузгодженого стану"""
+
+    print("=" * 60)
+    print("ТЕСТ: Атомарна заміна .ckpt")
+    print("=" * 60)
+
+    embedder = CountingEmbedder()
+    storage = FAISSStorage(dimension=DIM)
+    chunks = FakePreprocessor().process_document("a.txt").chunks
+    _embed_and_store(embedder, storage, chunks, {})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = str(Path(tmp) / "idx")
+
+        _save_checkpoint(storage, index_path, {"a.txt"})
+        _save_checkpoint(storage, index_path, {"a.txt", "b.txt"})
+        leftovers = [p.name for p in Path(tmp).iterdir() if ".tmp" in p.name]
+        assert not leftovers, f"Залишились тимчасові файли: {leftovers}"
+        loaded = FAISSStorage(dimension=DIM)
+        assert _load_checkpoint(loaded, index_path) == {"a.txt", "b.txt"}
+        assert loaded.index.ntotal == storage.index.ntotal
+        print("   ✅ Повторне збереження замінило checkpoint")
+
+        # Падіння посеред заміни: список файлів вже видалено -> checkpoint
+        # ігнорується цілком, а не поєднується зі старим/новим індексом
+        os_replace = os.replace
+        calls = []
+
+        def failing_replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError("імітація падіння")
+            os_replace(src, dst)
+
+        main.os.replace = failing_replace
+        try:
+            _save_checkpoint(storage, index_path, {"a.txt", "b.txt", "c.txt"})
+        except OSError:
+            pass
+        finally:
+            main.os.replace = os_replace
+
+        assert _load_checkpoint(FAISSStorage(dimension=DIM), index_path) == set(), \
+            "Неповний checkpoint не має завантажуватись"
+        print("   ✅ Перерваний запис не дав неузгодженого checkpoint")
+
+    print("\n🎉 Тест пройдено успішно!\n")
+
+
+if __name__ == "__main__":
+    test_duplicate_keeps_metadata()
+    test_resume_without_readding()
+    test_checkpoint_atomic_replace()
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.models import TextChunk
+from src.storage.storage import FAISSStorage
+
+DIM = 64
+N_VECTORS = 2000
+N_QUERIES = 50
+TOP_K = 10
+
+# Мінімальний recall@TOP_K відносно точного flat пошуку
+MIN_RECALL = {"sq8": 0.9, "hnsw": 0.9, "hnsw_sq8": 0.85}
+
+
+def _make_chunks(n):
+    return [
+        TextChunk(text=f"chunk {i}", chunk_id=f"c{i}", document_id="doc")
+        for i in range(n)
+    ]
+
+
+def _build(index_type, vectors, chunks, first_batch=1):
+    """Перша партія - з одного вектора: квантизатор не має вчитися на ній"""
+    storage = FAISSStorage(dimension=DIM, index_type=index_type, hnsw_ef_search=128)
+    storage.add_vectors(vectors[:first_batch], chunks[:first_batch])
+    storage.add_vectors(vectors[first_batch:], chunks[first_batch:])
+    return storage
+
+
+def _top_ids(storage, queries):
+    return [
+        {r.chunk_id for r in results}
+        for results in storage.search_batch(queries, top_k=TOP_K)
+    ]
+
+
+def test_index_types_recall():
+    """Recall sq8 / hnsw / hnsw_sq8 відносно flat (точний пошук)"""
+
+    print("=" * 60)
+    print("ТЕСТ: Recall типів індексу відносно flat")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((N_VECTORS, DIM)).astype(np.float32)
+    queries = rng.standard_normal((N_QUERIES, DIM)).astype(np.float32)
+    chunks = _make_chunks(N_VECTORS)
+
+    exact = _top_ids(_build("flat", vectors, chunks), queries)
+
+    for index_type, min_recall in MIN_RECALL.items():
+        approx = _top_ids(_build(index_type, vectors, chunks), queries)
+        recall = np.mean(
+            [len(a & e) / len(e) for a, e in zip(approx, exact)]
+        )
+        print(f"   {index_type}: recall@{TOP_K} = {recall:.3f}")
+        assert recall >= min_recall, f"{index_type}: recall {recall:.3f} < {min_recall}"
+
+    print("\n🎉 Тест пройдено успішно!\n")
+
+
+if __name__ == "__main__":
+    test_index_types_recall()
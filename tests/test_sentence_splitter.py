@@ -0,0 +1,140 @@
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.preprocessing.chunker import ChunkingConfig, SentenceChunker
+
+# Попередня реалізація SentenceChunker._split_into_sentences (еталон для паритету):
+# кандидати regex'ом, потім перевірка останнього слова речення на скорочення
+OLD_SENTENCE_ENDINGS = re.compile(r"([.!?…]+[\s\n]+)|([.!?…]+$)")
+OLD_ABBREVIATIONS = {
+    "др", "проф", "акад", "інж", "ст", "мол", "р",
+    "р.", "ст.", "див.", "напр.", "т.д.", "т.п.",
+    "Mr", "Mrs", "Dr", "Prof", "Inc", "Ltd", "etc",
+    "Ph.D", "M.D", "B.A", "M.A",
+}
+
+
+def _old_split_into_sentences(text):
+    sentences = []
+    current_start = 0
+
+    for match in OLD_SENTENCE_ENDINGS.finditer(text):
+        end_pos = match.end()
+        sentence = text[current_start:end_pos].strip()
+
+        words = sentence.split()
+        last_word = words[-1].rstrip(".!?…") if words else ""
+        if last_word.lower() not in OLD_ABBREVIATIONS:
+            if sentence:
+                sentences.append(sentence)
+            current_start = end_pos
+
+    if current_start < len(text):
+        remaining = text[current_start:].strip()
+        if remaining:
+            sentences.append(remaining)
+
+    return sentences
+
+
+def _new_split_into_sentences(text):
+    sentences = SentenceChunker(ChunkingConfig())._split_into_sentences(text)
+    for sentence, start, end in sentences:
+        assert text[start:end] == sentence, f"Позиції не відповідають реченню: {sentence!r}"
+    return [sentence for sentence, _, _ in sentences]
+
+
+# Скорочення, які розпізнавала й попередня реалізація (lowercase, без крапок)
+PARITY_TEXTS = [
+    # Скорочення
+    "Це зробив др. Іваненко. Потім проф. Петренко прийшов!",
+    "Згідно зі ст. 5 закону. Інж. Коваль та акад. Шевченко, мол. науковець.",
+    "Це було у 1999 р. Наступного року все змінилось.",
+    "Apples, pears, etc. are fruit. Bananas too!",
+    "Lists go on etc... And then stop.",
+    # Кирилиця
+    "Привіт, світе! Як справи? Усе добре… Дякую.",
+    "Перше речення.\n\nДруге речення після абзацу.\nТретє?! Так.",
+    "Їжак і ґудзик. Єнот — теж звір. Ось і все.",
+    # Текст без розділового знаку в кінці
+    "Перше речення. А це залишок без крапки",
+    "This is ASCII. And a tail without punctuation",
+    "Без жодного розділового знаку",
+    # ASCII (bytes regex) та краї
+    "Hello world. How are you? Fine!",
+    "Wait... what?! Yes.   Spaces\tand\ttabs.\n",
+    ". Leading dot. ",
+    "",
+    "   ",
+]
+
+_WORDS = [
+    "Привіт", "світ", "слово", "Київ", "др", "Др", "проф", "ст", "р", "мол",
+    "інж", "акад", "etc", "Hello", "world", "word", "a", "B", "1999", "x",
+]
+_PUNCTUATION = ["", "", "", ".", "!", "?", "…", "...", "?!", ".!"]
+_SEPARATORS = [" ", " ", "  ", "\n", "\n\n", "\t"]
+
+
+def _random_text(rng, words):
+    return "".join(
+        rng.choice(words) + rng.choice(_PUNCTUATION) + rng.choice(_SEPARATORS)
+        for _ in range(rng.randint(0, 40))
+    ) + rng.choice(["", "хвіст", "tail"])
+
+
+def test_sentence_splitter_parity():
+    """Новий splitter (str regex та ASCII bytes regex) збігається з попереднім"""
+
+    print("=" * 60)
+    print("ТЕСТ: Паритет розбиття на речення з попередньою реалізацією")
+    print("=" * 60)
+
+    for text in PARITY_TEXTS:
+        assert _new_split_into_sentences(text) == _old_split_into_sentences(text), \
+            f"Розбиття відрізняється: {text!r}"
+    print(f"   ✅ Фіксовані тексти: {len(PARITY_TEXTS)}")
+
+    rng = random.Random(0)
+    ascii_words = [w for w in _WORDS if w.isascii()]
+    for i in range(1000):
+        # Кожен другий текст - лише ASCII (гілка з bytes regex)
+        text = _random_text(rng, ascii_words if i % 2 else _WORDS)
+        assert _new_split_into_sentences(text) == _old_split_into_sentences(text), \
+            f"Розбиття відрізняється: {text!r}"
+    print("   ✅ Випадкові тексти: 1000")
+
+    print("\n🎉 Тест пройдено успішно!\n")
+
+
+def test_sentence_splitter_abbreviations_fixed():
+    """
+    Скорочення, які попередня реалізація пропускала (з великої літери та
+    з крапками всередині), тепер не розривають речення
+    """
+
+    print("=" * 60)
+    print("ТЕСТ: Скорочення з великої літери та з крапками")
+    print("=" * 60)
+
+    cases = {
+        "Mr. Smith came. He left.": ["Mr. Smith came.", "He left."],
+        "Works at Acme Inc. since May. Good.": ["Works at Acme Inc. since May.", "Good."],
+        "Книги, журнали т.д. Далі текст.": ["Книги, журнали т.д. Далі текст."],
+        "Див. напр. розділ 2. Кінець": ["Див. напр. розділ 2.", "Кінець"],
+    }
+    for text, expected in cases.items():
+        sentences = _new_split_into_sentences(text)
+        assert sentences == expected, f"{text!r}: {sentences}"
+        print(f"   ✅ {text!r} -> {len(sentences)} речення")
+
+    print("\n🎉 Тест пройдено успішно!\n")
+
+
+if __name__ == "__main__":
+    test_sentence_splitter_parity()
+    test_sentence_splitter_abbreviations_fixed()